@@ -0,0 +1,54 @@
+"""Fan out many conversations through AsyncAssistantManager against the local fake server.
+
+    python -m benchmarks.bench_async_manager --conversations 500 --concurrency 200 --run-time 1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import AsyncAssistantManager
+
+
+async def run(args, base_url):
+    client = AsyncOpenAI(api_key="fake", base_url=base_url, max_retries=0)
+    manager = AsyncAssistantManager(client)
+    await manager.create_assistant(name="bench", instructions="", tools=[])
+
+    questions = [f"question {i}" for i in range(args.conversations)]
+    start = time.perf_counter()
+    latencies, errors = [], 0
+    async for result in manager.ask_many(questions, concurrency=args.concurrency, timeout=args.timeout):
+        if result.error is not None:
+            errors += 1
+        else:
+            latencies.append(result.elapsed)
+    wall = time.perf_counter() - start
+    await client.close()
+    return wall, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--run-time", type=float, default=1.0, help="simulated run time in seconds")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-conversation deadline")
+    args = parser.parse_args()
+
+    with FakeOpenAI(run_duration=args.run_time) as fake:
+        wall, latencies, errors = asyncio.run(run(args, fake.base_url))
+
+    print(f"{args.conversations} conversations, concurrency {args.concurrency}, run time {args.run_time:g}s")
+    print(f"wall time {wall:.2f}s (serial would be >= {args.conversations * args.run_time:.0f}s), "
+          f"{len(latencies) / wall:.1f} conversations/s, {errors} errors")
+    if latencies:
+        latencies.sort()
+        print(f"latency p50={statistics.median(latencies):.2f}s p99={latencies[int(0.99 * (len(latencies) - 1))]:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
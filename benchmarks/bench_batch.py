@@ -0,0 +1,48 @@
+"""Answer bank_dataset.json requests with one chat call each and with BatchPipeline.
+
+The fake server completes a batch `--batch-seconds` after it is created and returns
+its results in shuffled order; the pipeline joins them back to the inputs by
+custom_id:
+
+    python -m benchmarks.bench_batch --limit 100
+"""
+import argparse
+import json
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import BatchPipeline, chat_request, get_client, join_results, result_content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--batch-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with open("bank_dataset.json") as file:
+        inputs = {f"bank-{i}": record["request"] for i, record in enumerate(json.load(file)[:args.limit])}
+    requests = [chat_request(custom_id, [{"role": "user", "content": question}], "gpt-3.5-turbo")
+                for custom_id, question in inputs.items()]
+
+    with FakeOpenAI(batch_duration=args.batch_seconds) as fake:
+        client = get_client("fake-key", base_url=fake.base_url)
+
+        start = time.perf_counter()
+        for request in requests:
+            client.chat.completions.create(**request["body"])
+        print(f"per-request  {len(requests)} answers, {fake.request_counts['chat.completions']:4d} HTTP calls, "
+              f"wall {time.perf_counter() - start:.2f}s")
+
+        fake.request_counts.clear()
+        pipeline = BatchPipeline(client, initial_delay=0.2, max_delay=1.0)
+        start = time.perf_counter()
+        results = pipeline.run(requests)
+        joined = [(question, result_content(result)) for question, result in join_results(inputs, results)]
+        correct = sum(answer == f"Echo: {question}" for question, answer in joined)
+        print(f"batch        {correct} answers joined correctly, {sum(fake.request_counts.values()):4d} HTTP calls, "
+              f"wall {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
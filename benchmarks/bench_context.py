@@ -0,0 +1,60 @@
+"""Hold a long conversation on one assistant thread with and without a ThreadContext budget.
+
+The fake server's runs take longer the more prompt tokens they read (--token-delay
+seconds per token), and report those tokens as run usage:
+
+    python -m benchmarks.bench_context --turns 40 --budget 2000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import AssistantManager, RunWaiter, get_client
+from openai_kit.context import ThreadContext
+
+QUESTION = ("I moved house last month and updated my address in the app, but my new card was still sent to the "
+            "old address and now there is a pending charge I do not recognise. Turn {turn}: what should I do next?")
+
+
+def converse(base_url, turns, context):
+    client = get_client("fake", base_url=base_url)
+    manager = AssistantManager(client, waiter=RunWaiter(client, initial_delay=0.02, max_delay=0.05),
+                               context=context)
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager.create_assistant(name="bench", instructions="You are a bank assistant.", tools=[])
+        manager.create_thread()
+        for turn in range(1, turns + 1):
+            start = time.perf_counter()
+            manager.add_message_to_thread("user", QUESTION.format(turn=turn))
+            manager.run_assistant(instructions=None)
+            run = manager.wait_for_completion()
+            rows.append((turn, run.usage.prompt_tokens, time.perf_counter() - start))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=2000)
+    parser.add_argument("--token-delay", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    for name in ("unbounded", "budgeted"):
+        with FakeOpenAI(run_duration=0.05, token_delay=0.0, prompt_token_delay=args.token_delay) as fake:
+            context = None
+            if name == "budgeted":
+                context = ThreadContext(get_client("fake", base_url=fake.base_url), budget=args.budget)
+            rows = converse(fake.base_url, args.turns, context)
+            total_tokens = sum(tokens for _, tokens, _ in rows)
+            checkpoints = sorted({1, args.turns // 4, args.turns // 2, args.turns} - {0})
+            summary = ", ".join(f"turn {turn}: {tokens} tokens {elapsed * 1000:.0f}ms"
+                                for turn, tokens, elapsed in rows if turn in checkpoints)
+            print(f"{name:10s} {total_tokens:7d} prompt tokens in total, "
+                  f"{fake.request_counts.get('threads.create', 0)} threads | {summary}")
+
+
+if __name__ == '__main__':
+    main()
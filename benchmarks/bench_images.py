@@ -0,0 +1,65 @@
+"""Generate and download images for many prompts, unthrottled and with ImageGenerator.generate_bulk.
+
+The fake server allows `--limit` image requests per second (standing in for a
+per-minute quota) and answers 429 with Retry-After beyond that:
+
+    python -m benchmarks.bench_images --prompts 100 --limit 20
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import get_client
+
+
+def load_image_generator():
+    spec = importlib.util.spec_from_file_location("dalle", "gpt-dalle-gen-v1.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ImageGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20, help="requests per second the fake accepts")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    prompts = [f"a white siamese cat in spaceship number {i}" for i in range(args.prompts)]
+
+    with FakeOpenAI(images_latency=0.2, images_rpm=args.limit, images_window=1.0) as fake:
+        generator = load_image_generator()("fake-key")
+        generator.client = get_client("fake-key", base_url=fake.base_url)
+
+        def generate(prompt):
+            try:
+                generator.generate_image(prompt)
+                return True
+            except Exception:
+                return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            failed = args.prompts - sum(pool.map(generate, prompts))
+        print(f"unthrottled   {args.prompts} prompts, {fake.request_counts.get('images.rate_limited', 0):4d} 429s, "
+              f"no downloads, {failed} failed, wall {time.perf_counter() - start:.2f}s")
+
+        fake.request_counts.clear()
+        fake.image_requests.clear()
+        time.sleep(1.0)
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            results = generator.generate_bulk(prompts, requests_per_minute=args.limit * 60,
+                                              concurrency=args.concurrency, download_dir=directory)
+            elapsed = time.perf_counter() - start
+            failed = sum(result.error is not None for result in results)
+            print(f"generate_bulk {args.prompts} prompts, {fake.request_counts.get('images.rate_limited', 0):4d} 429s, "
+                  f"{len(os.listdir(directory))} files downloaded, {failed} failed, wall {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare fixed-stride frame sampling with scene-aware keyframe selection on a synthetic video.
+
+The video alternates long static shots with short fast-moving ones; a good sampler
+covers every scene while sending few frames:
+
+    python -m benchmarks.bench_keyframes --scenes 12 --budget 16
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from openai_kit.video import iter_frames_at, keyframe_indices, sample_indices
+
+FPS = 25
+
+
+def write_synthetic_video(path, scenes, width, height, seed=0):
+    """returns the scene id of every frame"""
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (width, height))
+    frame_scenes = []
+    for scene in range(scenes):
+        background = rng.integers(0, 255, 3).tolist()
+        static = scene % 2 == 0
+        length = int(FPS * (4.0 if static else 1.2))
+        for i in range(length):
+            frame = np.empty((height, width, 3), np.uint8)
+            frame[:] = background
+            if static:
+                cv2.putText(frame, f"scene {scene}", (width // 8, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                            4, (255, 255, 255), 8)
+            else:
+                x = int(width * i / length)
+                cv2.circle(frame, (x, height // 2), height // 5, (0, 0, 0), -1)
+            writer.write(frame)
+            frame_scenes.append(scene)
+    writer.release()
+    return frame_scenes
+
+
+def report(name, indices, frame_scenes, elapsed, processed):
+    covered = len({frame_scenes[i] for i in indices})
+    print(f"{name:<22} sent {len(indices):3d} frames, covered {covered}/{len(set(frame_scenes))} scenes, "
+          f"{elapsed:.2f}s ({processed / elapsed:,.0f} frames/s processed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", type=int, default=12)
+    parser.add_argument("--budget", type=int, default=16)
+    parser.add_argument("--stride", type=int, default=25, help="stride of the fixed sampler")
+    parser.add_argument("--scan-stride", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.avi")
+        frame_scenes = write_synthetic_video(path, args.scenes, args.width, args.height)
+        print(f"{len(frame_scenes)} frames ({len(frame_scenes) / FPS:.1f}s) of {args.width}x{args.height}")
+
+        video = cv2.VideoCapture(path)
+        start = time.perf_counter()
+        indices = sample_indices(len(frame_scenes), FPS, stride=args.stride)
+        for _ in iter_frames_at(video, indices):
+            pass
+        report(f"stride {args.stride}", indices, frame_scenes, time.perf_counter() - start, len(frame_scenes))
+        video.release()
+
+        video = cv2.VideoCapture(path)
+        start = time.perf_counter()
+        indices = keyframe_indices(video, args.budget, scan_stride=args.scan_stride)
+        video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in iter_frames_at(video, indices):
+            pass
+        report(f"keyframes budget {args.budget}", indices, frame_scenes, time.perf_counter() - start,
+               len(frame_scenes))
+        video.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare per-symbol stock lookups with QuoteBatcher against a fake quote source.
+
+The fake source charges a fixed latency per HTTP call plus a small cost per symbol,
+like a bulk quote download:
+
+    python -m benchmarks.bench_quotes --runs 20 --tickers 5
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai_kit import QuoteBatcher
+
+
+class FakeQuoteSource:
+    def __init__(self, call_latency=0.15, symbol_latency=0.002):
+        self.call_latency = call_latency
+        self.symbol_latency = symbol_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, symbols):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.call_latency + self.symbol_latency * len(symbols))
+        return {symbol: round(100 + random.random() * 50, 2) for symbol in symbols}
+
+
+def run_steps(get_price, steps, concurrency):
+    """each step is one requires_action with several tickers, resolved concurrently"""
+    def step(symbols):
+        with ThreadPoolExecutor(max_workers=len(symbols)) as pool:
+            return list(pool.map(get_price, symbols))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(step, steps))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="concurrent runs, one requires_action step each")
+    parser.add_argument("--tickers", type=int, default=5, help="tickers per step")
+    parser.add_argument("--window", type=float, default=0.05)
+    args = parser.parse_args()
+
+    universe = [f"SYM{i}" for i in range(50)]
+    rng = random.Random(0)
+    steps = [rng.sample(universe, args.tickers) for _ in range(args.runs)]
+    lookups = args.runs * args.tickers
+
+    source = FakeQuoteSource()
+    wall = run_steps(lambda symbol: source([symbol])[symbol], steps, args.runs)
+    print(f"per-symbol  {lookups} lookups: {source.calls:4d} upstream calls, wall {wall:.2f}s")
+
+    source = FakeQuoteSource()
+    batcher = QuoteBatcher(source, window=args.window)
+    wall = run_steps(batcher.get, steps, args.runs)
+    print(f"batched     {lookups} lookups: {source.calls:4d} upstream calls, wall {wall:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Compare the old fixed-interval run waiter with openai_kit.RunWaiter.
+
+Runs are served by a local fake Assistants server, so no API key is needed:
+
+    python -m benchmarks.bench_run_waiter --runs 40 --old-interval 5
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import RunWaiter
+
+
+def old_wait(client, thread_id, run_id, interval):
+    """the loop every AssistantManager used to run"""
+    while True:
+        time.sleep(interval)
+        run_status = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+        if run_status.status == "completed":
+            return run_status
+
+
+def old_waiter(client, duration, interval):
+    run = client.beta.threads.runs.create(thread_id="thread_bench", assistant_id="asst_bench",
+                                          metadata={"duration": str(duration)})
+    return old_wait(client, "thread_bench", run.id, interval)
+
+
+def poll_waiter(client, duration):
+    return RunWaiter(client).run("thread_bench", "asst_bench", stream=False,
+                                 metadata={"duration": str(duration)})
+
+
+def stream_waiter(client, duration):
+    return RunWaiter(client).run("thread_bench", "asst_bench", stream=True,
+                                 metadata={"duration": str(duration)})
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def measure(name, waiter, durations, concurrency):
+    with FakeOpenAI() as fake:
+        client = OpenAI(api_key="fake", base_url=fake.base_url, max_retries=0)
+
+        def timed(duration):
+            start = time.perf_counter()
+            waiter(client, duration)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, durations))
+        retrieves = fake.request_counts.get("runs.retrieve", 0)
+
+    overhead = [latency - duration for latency, duration in zip(latencies, durations)]
+    print(f"{name:<14} p50={percentile(latencies, 50):6.2f}s  p90={percentile(latencies, 90):6.2f}s  "
+          f"p99={percentile(latencies, 99):6.2f}s  mean={statistics.mean(latencies):6.2f}s  "
+          f"overhead p50={percentile(overhead, 50):5.2f}s  retrieves/run={retrieves / len(durations):5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--old-interval", type=float, default=5.0, help="sleep of the old fixed-interval waiter")
+    parser.add_argument("--median-run", type=float, default=1.0, help="median simulated run time in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    durations = [rng.lognormvariate(0, 0.8) * args.median_run for _ in range(args.runs)]
+    print(f"{args.runs} runs, simulated run time p50={percentile(durations, 50):.2f}s "
+          f"p90={percentile(durations, 90):.2f}s max={max(durations):.2f}s")
+
+    measure(f"fixed {args.old_interval:g}s", lambda c, d: old_waiter(c, d, args.old_interval),
+            durations, args.concurrency)
+    measure("backoff poll", poll_waiter, durations, args.concurrency)
+    measure("streamed", stream_waiter, durations, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
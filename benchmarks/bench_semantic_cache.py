@@ -0,0 +1,66 @@
+"""Answer repeated customer questions with and without a SemanticCache in front of the assistant.
+
+Each topic is asked in several phrasings. The fake server's bag-of-words embeddings
+put rephrasings close together, so pick --threshold for them rather than for a real
+embedding model:
+
+    python -m benchmarks.bench_semantic_cache --rounds 2 --threshold 0.6
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import AsyncAssistantManager, get_client
+from openai_kit.semantic_cache import SemanticCache
+
+PHRASINGS = {
+    "card delivery": ["How long will it take for the card to arrive?", "when will my card arrive",
+                      "How long does it take for a new card to arrive?", "My card has not arrived, how long?"],
+    "failed transfer": ["I tried to make a transfer but it failed", "my transfer failed",
+                        "Why did my transfer fail?", "The transfer I tried to make failed"],
+    "card outlets": ["Which outlets accept my card?", "where is my card accepted",
+                     "Which shops accept my card?", "Is my card accepted at outlets abroad?"],
+    "pin change": ["How do I change my PIN?", "I want to change my card PIN",
+                   "Can I change the PIN of my card?", "change PIN"],
+}
+
+
+async def run(base_url, questions, cache, concurrency):
+    client = AsyncOpenAI(api_key="fake", base_url=base_url, max_retries=0)
+    manager = AsyncAssistantManager(client, answer_cache=cache)
+    await manager.create_assistant(name="bench", instructions="", tools=[])
+    start = time.perf_counter()
+    latencies = [result.elapsed async for result in manager.ask_many(questions, concurrency=concurrency)]
+    wall = time.perf_counter() - start
+    await client.close()
+    return wall, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2, help="times every phrasing is asked")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    questions = [q for phrasings in PHRASINGS.values() for q in phrasings] * args.rounds
+    random.Random(0).shuffle(questions)
+
+    for name in ("no cache", "semantic cache"):
+        with FakeOpenAI(run_duration=1.0) as fake:
+            cache = None
+            if name == "semantic cache":
+                cache = SemanticCache.for_client(get_client("fake", base_url=fake.base_url), threshold=args.threshold)
+            wall, latencies = asyncio.run(run(fake.base_url, questions, cache, args.concurrency))
+            print(f"{name:15s} {len(questions)} questions, {fake.request_counts.get('runs.create', 0):3d} runs, "
+                  f"wall {wall:.2f}s, latency p50 {statistics.median(latencies) * 1000:.0f}ms")
+            if cache is not None:
+                print(f"{'':15s} {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
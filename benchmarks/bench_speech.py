@@ -0,0 +1,61 @@
+"""Compare one audio.speech.create call for a whole script with SpeechSynthesizer.
+
+The fake server waits a fixed latency per request, then "synthesizes" the input a
+sentence at a time at a cost per character:
+
+    python -m benchmarks.bench_speech --sentences 40 --concurrency 4
+"""
+import argparse
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import SpeechSynthesizer, get_client, split_sentences
+
+
+def script(sentences):
+    lines = ["What a run down the left wing!", "He cuts inside, looks up and shoots.",
+             "The keeper gets a fingertip to it and the ball goes out for a corner.",
+             "Tension in the stadium as the players line up in the box."]
+    return " ".join(lines[i % len(lines)] for i in range(sentences))
+
+
+def timed(chunks):
+    """(time to first byte, total time, bytes)"""
+    start = time.perf_counter()
+    first, audio = None, b""
+    for data in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        audio += data
+    return first, time.perf_counter() - start, audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-chars", type=int, default=600)
+    args = parser.parse_args()
+    text = script(args.sentences)
+
+    with FakeOpenAI() as fake:
+        client = get_client("fake-key", base_url=fake.base_url)
+
+        def whole():
+            with client.audio.speech.with_streaming_response.create(model="tts-1", voice="onyx",
+                                                                     input=text) as response:
+                yield from response.iter_bytes()
+
+        first, total, _ = timed(whole())
+        print(f"single call  ({len(text)} chars): first audio {first:.2f}s, total {total:.2f}s")
+
+        synthesizer = SpeechSynthesizer(client, voice="onyx", max_chars=args.max_chars,
+                                        concurrency=args.concurrency)
+        first, total, audio = timed(synthesizer.iter_audio(text))
+        chunks = split_sentences(text, args.max_chars)
+        assert audio == "".join(chunks).encode(), "chunks came back out of order"
+        print(f"pipelined    ({len(chunks)} chunks): first audio {first:.2f}s, total {total:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Exact versus IVF search latency and recall on a synthetic VectorIndex.
+
+Vectors are random unit rows grouped around cluster centres, a rough stand-in for
+real embeddings; queries are noisy copies of indexed rows:
+
+    python -m benchmarks.bench_vectors --rows 200000 --dim 256
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from openai_kit.vectors import VectorIndex
+
+
+def synthetic_vectors(rows, dim, clusters=500, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    return centres[rng.integers(0, clusters, rows)] + 0.5 * rng.normal(size=(rows, dim)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-probe", type=int, default=8)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.rows, args.dim)
+    rng = np.random.default_rng(1)
+    targets = rng.integers(0, args.rows, args.queries)
+    queries = vectors[targets] + 0.1 * rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory)
+        # the "text" of each row is its position; skip the embeddings endpoint entirely
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        index.embed = lambda texts: unit[[int(text) for text in texts]]
+        start = time.perf_counter()
+        index.update({str(row): str(row) for row in range(args.rows)})
+        print(f"indexed {args.rows} x {args.dim} in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        exact = [index.search(query, 10) for query in queries]
+        print(f"exact  {(time.perf_counter() - start) / args.queries * 1000:6.2f} ms/query")
+
+        start = time.perf_counter()
+        index.build_ivf()
+        print(f"ivf built in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        approximate = [index.search(query, 10, n_probe=args.n_probe) for query in queries]
+        elapsed = (time.perf_counter() - start) / args.queries * 1000
+        recall = np.mean([len({i for i, _ in a} & {i for i, _ in e}) / 10 for a, e in zip(approximate, exact)])
+        print(f"ivf    {elapsed:6.2f} ms/query, recall@10 {recall:.2f} (n_probe {args.n_probe})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Transcribe a long synthetic recording in one whisper call and with SegmentedTranscriber.
+
+The recording is a sequence of numbered tone "words" separated by short and
+occasional long pauses, which the fake server transcribes back to "w<k>". The
+fake takes a fixed latency plus 1s per 100s of audio and, like the real API,
+rejects uploads over 25 MB:
+
+    python -m benchmarks.bench_whisper --minutes 20 --concurrency 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_kit import get_client
+from openai_kit.audio import SAMPLE_RATE, SegmentedTranscriber, wav_bytes
+
+
+def tone_word(k, seconds=0.4, rate=SAMPLE_RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    return (8000 * np.sin(2 * np.pi * (200 + 5 * k) * t)).astype(np.int16)
+
+
+def write_recording(path, minutes, seed=0):
+    """returns the words in order"""
+    rng = np.random.default_rng(seed)
+    parts, words, elapsed, k = [], [], 0.0, 0
+    while elapsed < minutes * 60:
+        pause = rng.uniform(1.5, 3.0) if rng.random() < 0.1 else rng.uniform(0.15, 0.4)
+        parts.append(tone_word(k % 600))
+        parts.append((rng.normal(0, 30, int(pause * SAMPLE_RATE))).astype(np.int16))
+        words.append(f"w{k % 600}")
+        elapsed += 0.4 + pause
+        k += 1
+    with open(path, "wb") as f:
+        f.write(wav_bytes(np.concatenate(parts)))
+    return words
+
+
+def report(name, words, text, elapsed):
+    found = text.split()
+    print(f"{name:22s} {elapsed:6.2f}s  {len(found)} words transcribed, "
+          f"{'matches' if found == words else 'DIFFERS from'} the recording")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=20)
+    parser.add_argument("--segment-seconds", type=float, default=120)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, FakeOpenAI() as fake:
+        path = os.path.join(directory, "recording.wav")
+        words = write_recording(path, args.minutes)
+        print(f"{args.minutes:g} min recording, {os.path.getsize(path) / 2**20:.1f} MB, {len(words)} words")
+        client = get_client("fake-key", base_url=fake.base_url)
+
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as audio_file:
+                text = client.audio.transcriptions.create(model="whisper-1", file=audio_file).text
+            report("single call", words, text, time.perf_counter() - start)
+        except Exception as e:
+            print(f"{'single call':22s} {time.perf_counter() - start:6.2f}s  failed: {e}")
+
+        for concurrency in (1, args.concurrency):
+            transcriber = SegmentedTranscriber(client, segment_seconds=args.segment_seconds, concurrency=concurrency)
+            start = time.perf_counter()
+            transcript = transcriber.transcribe(path)
+            report(f"segmented x{concurrency}", words, transcript.text, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
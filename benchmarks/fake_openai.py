@@ -0,0 +1,576 @@
+"""Minimal local stand-in for the OpenAI REST API, used by the benchmarks.
+
+Only the endpoints the benchmarks touch are implemented. Runs complete after the
+number of seconds given in their `metadata["duration"]` (default 1s, or the
+`run_duration` given to FakeOpenAI) and then post an assistant reply that echoes the
+last user message.
+"""
+import base64
+import io
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import wave
+import zlib
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+# a 1x1 transparent PNG
+FAKE_PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+
+def parse_multipart(content_type, body):
+    """{field name: bytes} of a multipart/form-data body"""
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    return {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+            for part in message.iter_parts()}
+
+
+class FakeOpenAI:
+    def __init__(self, host="127.0.0.1", port=0, run_duration=1.0, token_delay=0.01, speech_latency=0.3,
+                 speech_char_delay=0.002, transcription_latency=0.5, transcription_speed=100.0, batch_duration=2.0,
+                 images_latency=0.5, images_rpm=None, images_window=60.0, prompt_token_delay=0.0):
+        self.run_duration = run_duration
+        self.prompt_token_delay = prompt_token_delay
+        self.token_delay = token_delay
+        self.speech_latency = speech_latency
+        self.speech_char_delay = speech_char_delay
+        self.transcription_latency = transcription_latency
+        self.transcription_speed = transcription_speed
+        self.batch_duration = batch_duration
+        self.images_latency = images_latency
+        self.images_rpm = images_rpm
+        self.images_window = images_window
+        self.image_requests = []
+        self.files = {}
+        self.batches = {}
+        self.runs = {}
+        self.messages = {}
+        self.request_counts = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.routes = [
+            ("POST", re.compile(r"^/v1/chat/completions$"), self.chat_completion),
+            ("POST", re.compile(r"^/v1/audio/speech$"), self.create_speech),
+            ("POST", re.compile(r"^/v1/audio/transcriptions$"), self.create_transcription),
+            ("POST", re.compile(r"^/v1/embeddings$"), self.create_embeddings),
+            ("POST", re.compile(r"^/v1/images/generations$"), self.generate_images),
+            ("GET", re.compile(r"^/v1/images/files/([^/]+)$"), self.image_file),
+            ("POST", re.compile(r"^/v1/files$"), self.create_file),
+            ("GET", re.compile(r"^/v1/files/([^/]+)/content$"), self.file_content),
+            ("POST", re.compile(r"^/v1/batches$"), self.create_batch),
+            ("GET", re.compile(r"^/v1/batches/([^/]+)$"), self.retrieve_batch),
+            ("POST", re.compile(r"^/v1/batches/([^/]+)/cancel$"), self.cancel_batch),
+            ("POST", re.compile(r"^/v1/assistants$"), self.create_assistant),
+            ("POST", re.compile(r"^/v1/threads$"), self.create_thread),
+            ("GET", re.compile(r"^/v1/threads/([^/]+)$"), self.retrieve_thread),
+            ("POST", re.compile(r"^/v1/threads/([^/]+)/messages$"), self.create_message),
+            ("GET", re.compile(r"^/v1/threads/([^/]+)/messages$"), self.list_messages),
+            ("POST", re.compile(r"^/v1/threads/([^/]+)/runs$"), self.create_run),
+            ("GET", re.compile(r"^/v1/threads/([^/]+)/runs/([^/]+)$"), self.retrieve_run),
+            ("GET", re.compile(r"^/v1/threads/([^/]+)/runs$"), self.list_runs),
+            ("POST", re.compile(r"^/v1/threads/([^/]+)/runs/([^/]+)/cancel$"), self.cancel_run),
+        ]
+        self.server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def next_id(self, prefix):
+        with self._lock:
+            return f"{prefix}_{next(self._ids)}"
+
+    def count(self, name):
+        with self._lock:
+            self.request_counts[name] = self.request_counts.get(name, 0) + 1
+
+    # chat completions
+
+    def _completion_text(self, body):
+        content = body["messages"][-1]["content"]
+        if isinstance(content, list):
+            content = " ".join(part if isinstance(part, str) else part.get("text", "") for part in content
+                               if isinstance(part, str) or part.get("type") == "text")
+        return f"Echo: {content}"
+
+    def chat_completion(self, handler, body):
+        self.count("chat.completions")
+        completion_id = self.next_id("chatcmpl")
+        text = self._completion_text(body)
+        # like the real API, stop after max_tokens (a word per token here)
+        words = text.split(" ")[:body.get("max_tokens") or None]
+        text = " ".join(words)
+        if not body.get("stream"):
+            time.sleep(self.token_delay * len(words))
+            return handler.send_json({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": len(str(body["messages"])) // 4, "completion_tokens": len(words),
+                          "total_tokens": len(str(body["messages"])) // 4 + len(words)},
+            })
+
+        handler.start_events()
+        for index, word in enumerate(words):
+            time.sleep(self.token_delay)
+            handler.send_data({
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": None,
+                             "delta": {"content": word if index == 0 else f" {word}"}}],
+            })
+        handler.send_data({
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body["model"], "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}],
+        })
+        handler.send_data("[DONE]")
+
+    # speech
+
+    def create_speech(self, handler, body):
+        """the "audio" is the input text itself, generated a sentence at a time after an initial latency"""
+        self.count("audio.speech")
+        time.sleep(self.speech_latency)
+        handler.start_stream("audio/mpeg")
+        for part in re.findall(r"\S.*?(?:[.!?](?=\s)|$)\s*", body["input"]):
+            time.sleep(self.speech_char_delay * len(part))
+            handler.send_bytes(part.encode())
+
+    def create_transcription(self, handler, body):
+        """transcribes the tone words written by benchmarks.bench_whisper.tone_word: each burst of a
+        tone at 200 + 5k Hz is the word "w<k>"; uploads over 25 MB are rejected like the real API"""
+        import numpy as np
+
+        self.count("audio.transcriptions")
+        if len(body) > 25 * 1024 * 1024:
+            return handler.send_json({"error": {"message": "Maximum content size limit exceeded"}}, status=413)
+        form = parse_multipart(handler.headers["Content-Type"], body)
+        try:
+            with wave.open(io.BytesIO(form["file"]), "rb") as f:
+                rate = f.getframerate()
+                samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).astype(np.float32)
+        except (EOFError, wave.Error):
+            return handler.send_json({"error": {"message": "Invalid file format."}}, status=400)
+        duration = len(samples) / rate
+        time.sleep(self.transcription_latency + duration / self.transcription_speed)
+
+        frame = rate // 50
+        loud = np.abs(samples[:len(samples) // frame * frame]).reshape(-1, frame).max(axis=1) > 1000
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], loud.astype(np.int8), [0]])))
+        segments = []
+        for start, end in zip(edges[::2] * frame, edges[1::2] * frame):
+            burst = samples[start:end]
+            spectrum = np.abs(np.fft.rfft(burst))
+            frequency = spectrum.argmax() * rate / len(burst)
+            segments.append({"id": len(segments), "start": start / rate, "end": end / rate,
+                             "text": f" w{round((frequency - 200) / 5)}"})
+        handler.send_json({"task": "transcribe", "language": "english", "duration": duration,
+                           "text": "".join(segment["text"] for segment in segments).strip(),
+                           "segments": segments})
+
+    # embeddings
+
+    def create_embeddings(self, handler, body):
+        """hashed bag-of-words vectors: texts sharing words get similar embeddings"""
+        self.count("embeddings.create")
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for index, text in enumerate(inputs):
+            vector = [0.0] * 256
+            for word in re.findall(r"[a-z0-9']+", text.lower()):
+                vector[zlib.crc32(word.encode()) % 256] += 1.0
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        tokens = sum(len(text.split()) for text in inputs)
+        handler.send_json({"object": "list", "data": data, "model": body["model"],
+                           "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    # images
+
+    def generate_images(self, handler, body):
+        """answers 429 with Retry-After once images_rpm requests arrived within the last images_window
+        seconds (a minute, unless a benchmark compresses time)"""
+        now = time.monotonic()
+        with self._lock:
+            self.image_requests = [t for t in self.image_requests if t > now - self.images_window]
+            limited = self.images_rpm is not None and len(self.image_requests) >= self.images_rpm
+            if not limited:
+                self.image_requests.append(now)
+            retry_after = self.image_requests[0] + self.images_window - now if limited else 0
+        if limited:
+            self.count("images.rate_limited")
+            data = json.dumps({"error": {"message": "Rate limit reached for images per minute",
+                                         "type": "requests", "code": "rate_limit_exceeded"}}).encode()
+            handler.send_response(429)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.send_header("retry-after-ms", f"{retry_after * 1000:.0f}")
+            handler.send_header("Retry-After", f"{max(1, round(retry_after))}")
+            handler.end_headers()
+            return handler.wfile.write(data)
+
+        self.count("images.generate")
+        time.sleep(self.images_latency)
+        images = []
+        for _ in range(body.get("n") or 1):
+            image_id = self.next_id("img")
+            if body.get("response_format") == "b64_json":
+                images.append({"b64_json": base64.b64encode(FAKE_PNG).decode(), "revised_prompt": body["prompt"]})
+            else:
+                host, port = handler.server.server_address[:2]
+                images.append({"url": f"http://{host}:{port}/v1/images/files/{image_id}.png",
+                               "revised_prompt": body["prompt"]})
+        handler.send_json({"created": int(time.time()), "data": images})
+
+    def image_file(self, handler, body, name):
+        self.count("images.download")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "image/png")
+        handler.send_header("Content-Length", str(len(FAKE_PNG)))
+        handler.end_headers()
+        handler.wfile.write(FAKE_PNG)
+
+    # files and batches
+
+    def add_file(self, filename, purpose, content):
+        file = {"id": self.next_id("file"), "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": purpose, "status": "processed"}
+        with self._lock:
+            self.files[file["id"]] = (file, content)
+        return file
+
+    def create_file(self, handler, body):
+        self.count("files.create")
+        form = parse_multipart(handler.headers["Content-Type"], body)
+        handler.send_json(self.add_file("upload", form["purpose"].decode(), form["file"]))
+
+    def file_content(self, handler, body, file_id):
+        self.count("files.content")
+        if file_id not in self.files:
+            return handler.send_json({"error": {"message": f"No such File object: {file_id}"}}, status=404)
+        content = self.files[file_id][1]
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/octet-stream")
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def _complete_batch(self, batch):
+        """answer every request line; lines that are not chat requests go to the error file"""
+        lines = self.files[batch["input_file_id"]][1].decode().splitlines()
+        outputs, errors = [], []
+        for line in filter(None, lines):
+            request = json.loads(line)
+            result = {"id": self.next_id("batch_req"), "custom_id": request["custom_id"]}
+            if request.get("url") != batch["endpoint"] or "messages" not in request.get("body", {}):
+                errors.append(result | {"response": None, "error": {"code": "invalid_request",
+                                                                     "message": "Request is not a chat completion"}})
+                continue
+            body = request["body"]
+            text = self._completion_text(body)
+            completion = {
+                "id": self.next_id("chatcmpl"), "object": "chat.completion", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": len(str(body["messages"])) // 4, "completion_tokens": len(text.split()),
+                          "total_tokens": len(str(body["messages"])) // 4 + len(text.split())},
+            }
+            outputs.append(result | {"error": None,
+                                     "response": {"status_code": 200, "request_id": result["id"], "body": completion}})
+        # like the real service, results do not come back in input order
+        random.Random(batch["id"]).shuffle(outputs)
+        encode = lambda results: "".join(json.dumps(result) + "\n" for result in results).encode()
+        batch["output_file_id"] = self.add_file("batch_output.jsonl", "batch_output", encode(outputs))["id"]
+        if errors:
+            batch["error_file_id"] = self.add_file("batch_errors.jsonl", "batch_output", encode(errors))["id"]
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs),
+                                   "failed": len(errors)}
+        batch["completed_at"] = int(time.time())
+
+    def _batch_object(self, batch):
+        with self._lock:
+            finish = batch["status"] == "in_progress" and time.monotonic() >= batch["done_at"]
+            if finish:
+                batch["status"] = "finalizing"
+        if finish:
+            self._complete_batch(batch)
+            batch["status"] = "completed"
+        return {key: value for key, value in batch.items() if key != "done_at"}
+
+    def create_batch(self, handler, body):
+        self.count("batches.create")
+        if body["input_file_id"] not in self.files:
+            return handler.send_json({"error": {"message": f"No such File object: {body['input_file_id']}"}},
+                                     status=404)
+        batch = {
+            "id": self.next_id("batch"), "object": "batch", "endpoint": body["endpoint"], "errors": None,
+            "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+            "status": "in_progress", "output_file_id": None, "error_file_id": None,
+            "created_at": int(time.time()), "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}, "metadata": body.get("metadata"),
+            "done_at": time.monotonic() + self.batch_duration,
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        handler.send_json(self._batch_object(batch))
+
+    def retrieve_batch(self, handler, body, batch_id):
+        self.count("batches.retrieve")
+        if batch_id not in self.batches:
+            return handler.send_json({"error": {"message": f"No batch found with id '{batch_id}'"}}, status=404)
+        handler.send_json(self._batch_object(self.batches[batch_id]))
+
+    def cancel_batch(self, handler, body, batch_id):
+        self.count("batches.cancel")
+        batch = self.batches[batch_id]
+        with self._lock:
+            if batch["status"] == "in_progress":
+                batch["status"] = "cancelled"
+        handler.send_json(self._batch_object(batch))
+
+    # assistants, threads and messages
+
+    def create_assistant(self, handler, body):
+        self.count("assistants.create")
+        handler.send_json({"id": self.next_id("asst"), "object": "assistant", "created_at": int(time.time()),
+                           "model": body.get("model"), "name": body.get("name"),
+                           "instructions": body.get("instructions"), "tools": body.get("tools", []),
+                           "file_ids": body.get("file_ids", []), "metadata": {}})
+
+    def create_thread(self, handler, body):
+        self.count("threads.create")
+        thread_id = self.next_id("thread")
+        with self._lock:
+            self.messages[thread_id] = []
+        handler.send_json({"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+
+    def retrieve_thread(self, handler, body, thread_id):
+        self.count("threads.retrieve")
+        handler.send_json({"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+
+    def add_message(self, thread_id, role, text):
+        message = {
+            "id": self.next_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": role,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "file_ids": [],
+            "metadata": {},
+        }
+        with self._lock:
+            self.messages.setdefault(thread_id, []).append(message)
+        return message
+
+    def create_message(self, handler, body, thread_id):
+        self.count("messages.create")
+        handler.send_json(self.add_message(thread_id, body["role"], body["content"]))
+
+    def list_messages(self, handler, body, thread_id):
+        self.count("messages.list")
+        query = parse_qs(urlparse(handler.path).query)
+        order = query.get("order", ["desc"])[0]
+        limit = int(query.get("limit", ["20"])[0])
+        with self._lock:
+            messages = list(self.messages.get(thread_id, []))
+        if order == "desc":
+            messages.reverse()
+        ids = [message["id"] for message in messages]
+        if "after" in query:
+            messages = messages[ids.index(query["after"][0]) + 1:]
+        elif "before" in query:
+            messages = messages[:ids.index(query["before"][0])]
+        page = messages[:limit]
+        handler.send_json({
+            "object": "list",
+            "data": page,
+            "first_id": page[0]["id"] if page else None,
+            "last_id": page[-1]["id"] if page else None,
+            "has_more": len(messages) > limit,
+        })
+
+    # runs
+
+    def _reply(self, run):
+        with self._lock:
+            user_messages = [m for m in self.messages.get(run["thread_id"], []) if m["role"] == "user"]
+        question = user_messages[-1]["content"][0]["text"]["value"] if user_messages else ""
+        self.add_message(run["thread_id"], "assistant", f"Answer to: {question}")
+
+    def _run_object(self, run):
+        status = "completed" if time.monotonic() >= run["done_at"] else "in_progress"
+        if run["cancelled"] and status != "completed":
+            status = "cancelled"
+        if status == "completed":
+            with self._lock:
+                reply, run["replied"] = not run["replied"], True
+            if reply:
+                self._reply(run)
+        return {
+            "id": run["id"],
+            "object": "thread.run",
+            "assistant_id": run["assistant_id"],
+            "thread_id": run["thread_id"],
+            "status": status,
+            "created_at": run["created_at"],
+            "model": "fake-model",
+            "instructions": "",
+            "tools": [],
+            "file_ids": [],
+            "metadata": run["metadata"],
+            "usage": run["usage"] if status == "completed" else None,
+        }
+
+    def create_run(self, handler, body, thread_id):
+        self.count("runs.create")
+        metadata = body.get("metadata") or {}
+        with self._lock:
+            texts = [m["content"][0]["text"]["value"] for m in self.messages.get(thread_id, [])]
+        # roughly 4 characters per token; the run takes longer the more it has to read
+        prompt_tokens = sum(len(text) // 4 + 3 for text in texts) + len(body.get("instructions") or "") // 4
+        run = {
+            "id": self.next_id("run"),
+            "assistant_id": body["assistant_id"],
+            "thread_id": thread_id,
+            "created_at": int(time.time()),
+            "done_at": time.monotonic() + float(metadata.get("duration", self.run_duration))
+            + prompt_tokens * self.prompt_token_delay,
+            "metadata": metadata,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 10, "total_tokens": prompt_tokens + 10},
+            "replied": False,
+            "cancelled": False,
+        }
+        with self._lock:
+            self.runs[run["id"]] = run
+        if not body.get("stream"):
+            return handler.send_json(self._run_object(run))
+
+        handler.start_events()
+        handler.send_event("thread.run.created", self._run_object(run) | {"status": "queued"})
+        handler.send_event("thread.run.in_progress", self._run_object(run))
+        time.sleep(max(0.0, run["done_at"] - time.monotonic()))
+        handler.send_event("thread.run.completed", self._run_object(run))
+        handler.send_event("done", "[DONE]")
+
+    def retrieve_run(self, handler, body, thread_id, run_id):
+        self.count("runs.retrieve")
+        run = self.runs.get(run_id)
+        if run is None:
+            return handler.send_json({"error": {"message": f"No run found with id '{run_id}'"}}, status=404)
+        handler.send_json(self._run_object(run))
+
+    def list_runs(self, handler, body, thread_id):
+        self.count("runs.list")
+        with self._lock:
+            runs = [run for run in self.runs.values() if run["thread_id"] == thread_id]
+        page = [self._run_object(run) for run in reversed(runs)][:int(parse_qs(urlparse(handler.path).query)
+                                                                      .get("limit", ["20"])[0])]
+        handler.send_json({"object": "list", "data": page, "first_id": page[0]["id"] if page else None,
+                           "last_id": page[-1]["id"] if page else None, "has_more": len(runs) > len(page)})
+
+    def cancel_run(self, handler, body, thread_id, run_id):
+        self.count("runs.cancel")
+        run = self.runs.get(run_id)
+        if run is None:
+            return handler.send_json({"error": {"message": f"No run found with id '{run_id}'"}}, status=404)
+        run["cancelled"] = True
+        handler.send_json(self._run_object(run))
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw and "json" in (self.headers.get("Content-Type") or "") else raw
+                path = self.path.split("?", 1)[0]
+                for route_method, pattern, view in fake.routes:
+                    match = pattern.match(path)
+                    if route_method == method and match:
+                        return view(self, body, *match.groups())
+                self.send_json({"error": {"message": f"Unknown route {method} {path}"}}, status=404)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def send_json(self, payload, status=200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def start_events(self):
+                self.start_stream("text/event-stream")
+
+            def start_stream(self, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+            def send_bytes(self, data):
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def send_data(self, data):
+                self.send_event(None, data)
+
+            def send_event(self, event, data):
+                payload = data if isinstance(data, str) else json.dumps(data)
+                prefix = f"event: {event}\n" if event else ""
+                try:
+                    self.wfile.write(f"{prefix}data: {payload}\n\n".encode())
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # clients may hang up as soon as they see the terminal event
+                    pass
+
+        return Handler
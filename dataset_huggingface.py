@@ -1,25 +1,132 @@
-import pandas as pd
-from datasets import load_dataset
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
+from datasets import IterableDataset, load_dataset
 
-def load_and_process_dataset(dataset_name, output_file):
-    # Load a dataset by name
-    dataset = load_dataset(dataset_name, split="train")
+FORMATS = {".jsonl": "jsonl", ".json": "json", ".parquet": "parquet"}
+
+
+def _record_batches(dataset, columns, batch_size):
+    """yield pyarrow Tables of at most batch_size rows holding only `columns`"""
+    import pyarrow as pa
+
+    dataset = dataset.select_columns(list(columns))
+    if isinstance(dataset, IterableDataset):
+        for batch in dataset.iter(batch_size=batch_size):
+            yield pa.Table.from_pydict(batch)
+        return
+    # map-style datasets are memory-mapped Arrow: slice them without copying to Python
+    yield from dataset.with_format("arrow").iter(batch_size=batch_size)
+
+
+class _JsonLinesWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, table):
+        self.file.writelines(json.dumps(record) + "\n" for record in table.to_pylist())
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonArrayWriter(_JsonLinesWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file.write("[")
+        self.first = True
+
+    def write(self, table):
+        for record in table.to_pylist():
+            self.file.write(("" if self.first else ",") + json.dumps(record))
+            self.first = False
+
+    def close(self):
+        self.file.write("]")
+        super().close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, table):
+        import pyarrow.parquet as pq
 
-    # Create a DataFrame and select relevant columns
-    df = pd.DataFrame(dataset).reset_index(drop=True)
-    df = df[['request', 'response-1']]
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
 
-    # Convert DataFrame to JSON records
-    json_data = df.to_json(orient="records")
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
 
-    # Save JSON data to a file
-    with open(output_file, 'w') as file:
-        file.write(json_data)
+
+WRITERS = {"jsonl": _JsonLinesWriter, "json": _JsonArrayWriter, "parquet": _ParquetWriter}
+
+
+def write_batches(batches, output_file, format):
+    """write record batches one at a time; returns the number of rows written"""
+    writer = WRITERS[format](output_file)
+    rows = 0
+    try:
+        for batch in batches:
+            writer.write(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def _shard_path(output_file, index, num_shards):
+    root, extension = os.path.splitext(output_file)
+    return f"{root}-{index:05d}-of-{num_shards:05d}{extension}"
+
+
+def _export_shard(task):
+    dataset_name, split, columns, format, batch_size, index, num_shards, output_file = task
+    dataset = load_dataset(dataset_name, split=split).shard(num_shards=num_shards, index=index, contiguous=True)
+    return write_batches(_record_batches(dataset, columns, batch_size), output_file, format)
+
+
+def export_dataset(dataset_name, output_file, columns=("request", "response-1"), split="train", format=None,
+                   batch_size=10_000, num_shards=None, streaming=False):
+    """write the `columns` of a dataset split to output_file, batch by batch.
+
+    format is "jsonl", "json" (one array) or "parquet", inferred from the file
+    extension by default. Only one record batch is in memory at a time; with
+    streaming=True the split is not even downloaded in full. num_shards splits the
+    export over that many processes, each writing <name>-<i>-of-<n><ext>.
+    Returns {path: rows written}.
+    """
+    format = format or FORMATS.get(os.path.splitext(output_file)[1].lower(), "jsonl")
+    if num_shards and num_shards > 1 and not streaming:
+        load_dataset(dataset_name, split=split)  # download and prepare once before the workers start
+        paths = [_shard_path(output_file, index, num_shards) for index in range(num_shards)]
+        tasks = [(dataset_name, split, tuple(columns), format, batch_size, index, num_shards, path)
+                 for index, path in enumerate(paths)]
+        with ProcessPoolExecutor(max_workers=num_shards) as pool:
+            return dict(zip(paths, pool.map(_export_shard, tasks)))
+
+    dataset = load_dataset(dataset_name, split=split, streaming=streaming)
+    return {output_file: write_batches(_record_batches(dataset, columns, batch_size), output_file, format)}
+
+
+def load_and_process_dataset(dataset_name, output_file):
+    # Stream the request/response columns straight to a JSON array file, whatever the extension
+    rows = export_dataset(dataset_name, output_file, columns=("request", "response-1"), format="json")
+    print(f"Wrote {sum(rows.values())} records to {', '.join(rows)}")
 
 
 if __name__ == '__main__':
     dataset_name = "argilla/llama-2-banking-fine-tune"
-    output_file = 'bank_dataset.json'
+    # python dataset_huggingface.py [output_file [num_shards]]; .jsonl, .json and .parquet are supported
+    output_file = sys.argv[1] if len(sys.argv) > 1 else 'bank_dataset.json'
+    num_shards = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
-    load_and_process_dataset(dataset_name, output_file)
+    # the format follows the output file's extension
+    rows = export_dataset(dataset_name, output_file, num_shards=num_shards)
+    print(f"Wrote {sum(rows.values())} records to {', '.join(rows)}")
@@ -0,0 +1,210 @@
+import csv
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from openai_kit.tokens import chat_tokens, count_tokens, truncate_tokens
+
+SYSTEM_PROMPT = "You are a customer service representative from Bank of America. Please reply to customer requests using polite and respectful language."
+
+# USD per 1M training tokens; fine-tuning bills every token of the file once per epoch
+TRAINING_PRICE_PER_MILLION = {"gpt-4o-mini": 3.00, "gpt-4o": 25.00, "gpt-3.5-turbo": 8.00}
+
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def read_pairs(path, batch_size=10_000):
+    """yield (request, response) from a dataset_huggingface.py export (.jsonl, .json, .csv or .parquet)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from _pairs(batch.to_pylist())
+    elif extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as file:
+            yield from _pairs(csv.DictReader(file))
+    elif extension == ".jsonl":
+        with open(path, encoding="utf-8") as file:
+            yield from _pairs(json.loads(line) for line in file if line.strip())
+    else:
+        with open(path, encoding="utf-8") as file:
+            yield from _pairs(json.load(file))
+
+
+def _pairs(records):
+    for record in records:
+        response = record.get("response-1", record.get("response"))
+        yield (record.get("request") or "").strip(), (response or "").strip()
+
+
+def pair_digest(request, response):
+    """hash of a pair ignoring case, punctuation and whitespace, so near-identical pairs collide"""
+    text = "\x1f".join(_NOT_WORD.sub(" ", part.casefold()).strip() for part in (request, response))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def chat_example(request, response, system_prompt=SYSTEM_PROMPT):
+    messages = [{"role": "user", "content": request}, {"role": "assistant", "content": response}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    return {"messages": messages}
+
+
+def fit_example(example, max_tokens, model, truncate=True):
+    """(example, tokens, truncated) with the assistant reply cut to fit max_tokens, or (None, tokens, False)"""
+    tokens = chat_tokens(example["messages"], model)
+    if tokens <= max_tokens:
+        return example, tokens, False
+    reply = example["messages"][-1]
+    keep = count_tokens(reply["content"], model) - (tokens - max_tokens)
+    if not truncate or keep <= 0:
+        return None, tokens, False
+    reply["content"] = truncate_tokens(reply["content"], keep, model)
+    # re-encoding a cut can merge differently, so measure again
+    tokens = chat_tokens(example["messages"], model)
+    return (example, tokens, True) if tokens <= max_tokens else (None, tokens, False)
+
+
+def _fit_chunk(task):
+    examples, max_tokens, model, truncate = task
+    return [fit_example(example, max_tokens, model, truncate) for example in examples]
+
+
+class ShardWriter:
+    """JSONL shards filled so their token totals stay within one example of each other"""
+
+    def __init__(self, directory, num_shards, prefix="train"):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f"{prefix}-{index:05d}-of-{num_shards:05d}.jsonl")
+                      for index in range(num_shards)]
+        self.files = [open(path, "w", encoding="utf-8") for path in self.paths]
+        self.tokens = [0] * num_shards
+        self.examples = [0] * num_shards
+        self._lightest = [(0, index) for index in range(num_shards)]
+
+    def write(self, example, tokens):
+        _, index = heapq.heappop(self._lightest)
+        self.files[index].write(json.dumps(example) + "\n")
+        self.tokens[index] += tokens
+        self.examples[index] += 1
+        heapq.heappush(self._lightest, (self.tokens[index], index))
+
+    def close(self):
+        for file in self.files:
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def training_cost(tokens, model, epochs):
+    """estimated USD for training on `tokens` for `epochs`, or None for an unknown model"""
+    for prefix, price in TRAINING_PRICE_PER_MILLION.items():
+        if model.startswith(prefix):
+            return round(tokens * epochs * price / 1_000_000, 2)
+    return None
+
+
+def build_finetune_dataset(input_path, output_dir, model="gpt-3.5-turbo", system_prompt=SYSTEM_PROMPT,
+                           max_tokens=4096, truncate=True, num_shards=4, epochs=3, workers=None,
+                           chunk_size=2000):
+    """turn request/response pairs into chat-format fine-tuning shards; returns the stats report.
+
+    Pairs are deduplicated by pair_digest before any tokenizing. Token counting and
+    truncation run in a process pool, chunk_size examples per task, with only a few
+    chunks in flight so memory stays flat however large the input is. Examples over
+    max_tokens have their reply truncated (or are dropped with truncate=False) and
+    are written in input order, each to the shard holding the fewest tokens so far.
+    The report is also written to output_dir/stats.json.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = {"model": model, "read": 0, "empty": 0, "duplicates": 0, "truncated": 0, "dropped": 0}
+    seen = set()
+
+    def chunks():
+        chunk = []
+        for request, response in read_pairs(input_path):
+            stats["read"] += 1
+            if not request or not response:
+                stats["empty"] += 1
+                continue
+            digest = pair_digest(request, response)
+            if digest in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(digest)
+            chunk.append(chat_example(request, response, system_prompt))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def fitted(pool):
+        tasks = ((chunk, max_tokens, model, truncate) for chunk in chunks())
+        if pool is None:
+            yield from map(_fit_chunk, tasks)
+            return
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_fit_chunk, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    with ShardWriter(output_dir, num_shards) as shards:
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as pool:
+            for results in fitted(pool):
+                for example, tokens, truncated in results:
+                    if example is None:
+                        stats["dropped"] += 1
+                        continue
+                    stats["truncated"] += truncated
+                    shards.write(example, tokens)
+
+    total = sum(shards.tokens)
+    stats.update({
+        "examples": sum(shards.examples),
+        "tokens": total,
+        "shards": [{"path": path, "examples": examples, "tokens": tokens}
+                   for path, examples, tokens in zip(shards.paths, shards.examples, shards.tokens)],
+        "epochs": epochs,
+        "billed_tokens": total * epochs,
+        "estimated_cost_usd": training_cost(total, model, epochs),
+    })
+    with open(os.path.join(output_dir, "stats.json"), "w") as file:
+        json.dump(stats, file, indent=2)
+    return stats
+
+
+if __name__ == '__main__':
+    # python finetune_dataset.py [input_file [output_dir [num_shards]]]
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'bank_dataset.json'
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else 'bank_finetune'
+    num_shards = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    if not os.path.exists(input_path):
+        from dataset_huggingface import export_dataset
+
+        export_dataset("argilla/llama-2-banking-fine-tune", input_path)
+
+    stats = build_finetune_dataset(input_path, output_dir, num_shards=num_shards)
+    print(f"{stats['examples']} examples ({stats['tokens']} tokens) from {stats['read']} rows: "
+          f"{stats['duplicates']} duplicates, {stats['empty']} empty, {stats['truncated']} truncated, "
+          f"{stats['dropped']} dropped")
+    for shard in stats["shards"]:
+        print(f"  {shard['path']}: {shard['examples']} examples, {shard['tokens']} tokens")
+    if stats["estimated_cost_usd"] is not None:
+        print(f"Estimated training cost: ${stats['estimated_cost_usd']:.2f} "
+              f"({stats['billed_tokens']} tokens over {stats['epochs']} epochs)")
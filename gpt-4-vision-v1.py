@@ -1,18 +1,19 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+from openai_kit import StreamStats, astream_chat, default_cache, get_async_client, get_client, request_key, stream_chat
 
 load_dotenv()
 
 
 class GPTAssistant:
-    def __init__(self, api_key: str, model: str = "gpt-4-vision-preview"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "gpt-4-vision-preview", cache=None):
+        self.api_key = api_key
+        self.client = get_client(api_key)
         self.model = model
+        self.cache = cache
 
-    def generate_image_description(self, image_url):
-        """generate image description"""
-        messages = [
+    def _messages(self, image_url):
+        return [
             {
                 "role": "user",
                 "content": [
@@ -23,23 +24,71 @@ class GPTAssistant:
             }
         ]
 
+    def _cache_key(self, image_url):
+        return request_key(endpoint="chat.completions", model=self.model, messages=self._messages(image_url),
+                           max_tokens=300)
+
+    def _cached(self, image_url):
+        if self.cache is None:
+            return None
+        data = self.cache.get(self._cache_key(image_url))
+        return None if data is None else data.decode("utf-8")
+
+    def _store(self, image_url, text):
+        if self.cache is not None:
+            self.cache.put(self._cache_key(image_url), text.encode("utf-8"))
+
+    def generate_image_description(self, image_url):
+        """generate image description"""
+        cached = self._cached(image_url)
+        if cached is not None:
+            return cached
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._messages(image_url),
             max_tokens=300
         )
 
-        return response.choices[0].message.content
+        description = response.choices[0].message.content
+        self._store(image_url, description)
+        return description
+
+    def stream_image_description(self, image_url, stats: StreamStats = None):
+        """yield the image description as it is generated; a cached description comes back in one piece"""
+        cached = self._cached(image_url)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        for text in stream_chat(self.client, stats, model=self.model, messages=self._messages(image_url),
+                                max_tokens=300):
+            parts.append(text)
+            yield text
+        self._store(image_url, "".join(parts))
+
+    async def astream_image_description(self, image_url, stats: StreamStats = None):
+        """async iterator over the image description as it is generated"""
+        cached = self._cached(image_url)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        async for text in astream_chat(get_async_client(self.api_key), stats, model=self.model,
+                                       messages=self._messages(image_url), max_tokens=300):
+            parts.append(text)
+            yield text
+        self._store(image_url, "".join(parts))
 
 
 def main():
     api_key = os.getenv("api_key")
-    assistant = GPTAssistant(api_key)
+    assistant = GPTAssistant(api_key, cache=default_cache())
 
     image_url = "https://s3.amazonaws.com/youtube-demo-bkt/Presidential-Results-Sheets-Greater-Accra-34-726x1024.jpg"
-    result_content = assistant.generate_image_description(image_url)
-
-    print(result_content)
+    stats = StreamStats()
+    for text in assistant.stream_image_description(image_url, stats):
+        print(text, end="", flush=True)
+    print(f"\n\n{stats}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+from dotenv import load_dotenv
+import json
+import os
+import sys
+
+from openai_kit import BatchPipeline, chat_request, get_client, join_results, result_content
+
+load_dotenv()
+
+INSTRUCTIONS = "You are a helpful customer support assistant for a bank. Answer the customer's question briefly."
+
+
+class BankBatchProcessor:
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", client=None):
+        self.client = client or get_client(api_key)
+        self.model = model
+        self.pipeline = BatchPipeline(self.client)
+
+    def load_requests(self, dataset_path, limit=None):
+        """{custom_id: customer request} from a dataset_huggingface.py export"""
+        with open(dataset_path) as file:
+            records = json.load(file)
+        return {f"bank-{index}": record["request"] for index, record in enumerate(records[:limit])}
+
+    def build_requests(self, inputs):
+        """Batch API request lines for the customer requests"""
+        for custom_id, question in inputs.items():
+            messages = [{"role": "system", "content": INSTRUCTIONS}, {"role": "user", "content": question}]
+            yield chat_request(custom_id, messages, self.model, max_tokens=300)
+
+    def write_requests(self, inputs, requests_path):
+        """write the batch input file, e.g. to inspect it or submit it by hand"""
+        with open(requests_path, "w") as file:
+            for request in self.build_requests(inputs):
+                file.write(json.dumps(request) + "\n")
+
+    def process(self, inputs, output_path):
+        """run the requests through the Batch API and write one {custom_id, request, answer, error} line each"""
+        completed = failed = 0
+        with open(output_path, "w") as output:
+            results = self.pipeline.run(self.build_requests(inputs), metadata={"source": "bank_dataset"})
+            for question, result in join_results(inputs, results):
+                answer = result_content(result)
+                error = None if answer is not None else (result.get("error") or result.get("response"))
+                output.write(json.dumps({"custom_id": result["custom_id"], "request": question,
+                                         "answer": answer, "error": error}) + "\n")
+                completed, failed = completed + (answer is not None), failed + (answer is None)
+        return completed, failed
+
+
+def main():
+    api_key = os.getenv("api_key")
+    processor = BankBatchProcessor(api_key)
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    inputs = processor.load_requests("bank_dataset.json", limit)
+    processor.write_requests(inputs, "bank_batch_requests.jsonl")
+
+    completed, failed = processor.process(inputs, "bank_batch_results.jsonl")
+    print(f"{completed} answers written to bank_batch_results.jsonl, {failed} failed")
+
+
+if __name__ == '__main__':
+    main()
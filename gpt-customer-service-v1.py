@@ -1,85 +1,76 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
-import time
+import asyncio
+import json
+import sys
 
-load_dotenv()
+from openai_kit import AssistantManager, AsyncAssistantManager, ResourceRegistry, aclose_async_clients, get_client
+from openai_kit.context import ThreadContext
+from openai_kit.semantic_cache import SemanticCache
+from openai_kit.vectors import VectorIndex
 
+ASSISTANT_NAME = "Customer Service Assistant"
+ASSISTANT_INSTRUCTIONS = "You are a customer service representative from Bank of America. Please reply to customer requests using polite and respectful language."
 
-class AssistantManager:
-    def __init__(self, api_key, model="gpt-4-1106-preview"):
-        self.client = OpenAI(api_key=api_key)
+INDEX_DIRECTORY = ".openai_index/bank_dataset"
+
+
+class LocalCustomerService:
+    """answer with a plain chat completion grounded in the closest bank_dataset replies.
+
+    Replaces the hosted retrieval tool: the dataset is embedded once into a local
+    VectorIndex (only new or edited rows are re-embedded on later runs) and each
+    question is matched against it in-process.
+    """
+
+    def __init__(self, client=None, model: str = "gpt-3.5-turbo", dataset_path: str = "bank_dataset.json",
+                 index_directory: str = INDEX_DIRECTORY, k: int = 3):
+        self.client = client or get_client()
         self.model = model
-        self.file_id = None
-        self.assistant = None
-        self.thread = None
-        self.run = None
-
-    def create_file(self, file_path, purpose='assistants'):
-        with open(file_path, "rb") as file:
-            file_obj = self.client.files.create(file=file, purpose=purpose)
-            self.file_id = file_obj.id
-
-    def create_assistant(self, name, instructions, tools):
-        self.assistant = self.client.beta.assistants.create(
-            name=name,
-            instructions=instructions,
-            model=self.model,
-            tools=tools,
-            file_ids=[self.file_id]
-        )
-
-    def create_thread(self):
-        self.thread = self.client.beta.threads.create()
-
-    def add_message_to_thread(self, role, content):
-        self.client.beta.threads.messages.create(
-            thread_id=self.thread.id,
-            role=role,
-            content=content
-        )
-
-    def run_assistant(self, instructions):
-        self.run = self.client.beta.threads.runs.create(
-            thread_id=self.thread.id,
-            assistant_id=self.assistant.id,
-            instructions=instructions
-        )
-
-    def wait_for_completion(self):
-        while True:
-            time.sleep(5)
-            run_status = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread.id,
-                run_id=self.run.id
-            )
-            print(run_status.model_dump_json(indent=4))
-
-            if run_status.status == 'completed':
-                self.process_messages()
-                break
-            else:
-                print("Waiting for the Assistant to process...")
-
-    def process_messages(self):
-        messages = self.client.beta.threads.messages.list(thread_id=self.thread.id)
-
-        for msg in messages.data:
-            role = msg.role
-            content = msg.content[0].text.value
-            print(f"{role.capitalize()}: {content}")
+        self.dataset_path = dataset_path
+        self.index = VectorIndex(index_directory, self.client)
+        self.k = k
+        self.records = {}
+
+    def refresh(self):
+        """(re)index the dataset; returns how many rows had to be embedded"""
+        with open(self.dataset_path) as file:
+            self.records = {f"bank-{index}": record for index, record in enumerate(json.load(file))}
+        return self.index.update({record_id: f"Customer: {record['request']}\nAgent: {record['response-1']}"
+                                  for record_id, record in self.records.items()})
+
+    def _messages(self, question):
+        matches = self.index.search(question, self.k)
+        examples = "\n\n".join(f"Customer: {self.records[record_id]['request']}\n"
+                                f"Agent: {self.records[record_id]['response-1'].strip()}"
+                                for record_id, _ in matches)
+        return [
+            {"role": "system", "content": f"{ASSISTANT_INSTRUCTIONS}\n\n"
+                                          f"Replies to similar past requests:\n\n{examples}"},
+            {"role": "user", "content": question},
+        ]
+
+    def ask(self, question):
+        if not self.records:
+            self.refresh()
+        response = self.client.chat.completions.create(model=self.model, messages=self._messages(question))
+        return response.choices[0].message.content
+
+
+def main_local(questions):
+    service = LocalCustomerService()
+    print(f"Embedded {service.refresh()} new or changed rows")
+    for question in questions:
+        print(f"{question!r}\nAssistant: {service.ask(question)}")
 
 
 def main():
-    api_key = os.getenv("api_key")
-    manager = AssistantManager(api_key)
+    manager = AssistantManager(registry=ResourceRegistry())
 
     # process 1
     manager.create_file("bank_dataset.json")
     # process 2
     manager.create_assistant(
-        name="Customer Service Assistant",
-        instructions="You are a customer service representative from Bank of America. Please reply to customer requests using polite and respectful language.",
+        name=ASSISTANT_NAME,
+        instructions=ASSISTANT_INSTRUCTIONS,
         tools=[{"type": "retrieval"}]
     )
     # process 3
@@ -91,5 +82,60 @@ def main():
     manager.wait_for_completion()
 
 
+def main_chat(budget=4000):
+    """one long conversation on a single thread, kept under `budget` prompt tokens"""
+    context = ThreadContext(get_client(), budget=budget)
+    manager = AssistantManager(registry=ResourceRegistry(), context=context)
+    manager.create_file("bank_dataset.json")
+    manager.create_assistant(
+        name=ASSISTANT_NAME,
+        instructions=ASSISTANT_INSTRUCTIONS,
+        tools=[{"type": "retrieval"}]
+    )
+    manager.create_thread()
+    while True:
+        try:
+            question = input("You: ").strip()
+        except EOFError:
+            break
+        if not question:
+            break
+        manager.add_message_to_thread(role="user", content=question)
+        manager.run_assistant(instructions=None)
+        manager.wait_for_completion()
+    total = sum(usage["prompt_tokens"] or usage["estimated_prompt_tokens"] for usage in context.usage)
+    print(f"{len(context.usage)} runs, {total} prompt tokens")
+
+
+async def main_async(questions, concurrency=100, timeout=120):
+    """answer many customer questions concurrently, printing each answer as it completes"""
+    # rephrasings of a question already answered are served from memory instead of a new run
+    answer_cache = SemanticCache.for_client(get_client(), threshold=0.9, ttl=3600)
+    manager = AsyncAssistantManager(registry=ResourceRegistry(), answer_cache=answer_cache)
+    await manager.create_file("bank_dataset.json")
+    await manager.create_assistant(
+        name=ASSISTANT_NAME,
+        instructions=ASSISTANT_INSTRUCTIONS,
+        tools=[{"type": "retrieval"}]
+    )
+    async for result in manager.ask_many(questions, concurrency=concurrency, timeout=timeout):
+        if result.error is not None:
+            print(f"[{result.index}] {result.question!r} failed after {result.elapsed:.1f}s: {result.error!r}")
+        else:
+            print(f"[{result.index}] {result.question!r} ({result.elapsed:.1f}s)\nAssistant: {result.answer}")
+    print(f"answer cache: {answer_cache.stats()}")
+    await aclose_async_clients()
+
+
 if __name__ == '__main__':
-    main()
+    # python gpt-customer-service-v1.py "question 1" "question 2" ... answers them concurrently
+    # python gpt-customer-service-v1.py --local "question 1" ... answers from the local index instead
+    # python gpt-customer-service-v1.py --chat holds one conversation read from stdin under a token budget
+    if len(sys.argv) > 1 and sys.argv[1] == "--chat":
+        main_chat()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--local":
+        main_local(sys.argv[2:] or ["How long will it take for the card to arrive?"])
+    elif len(sys.argv) > 1:
+        asyncio.run(main_async(sys.argv[1:]))
+    else:
+        main()
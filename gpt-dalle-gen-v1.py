@@ -1,34 +1,146 @@
-from openai import OpenAI
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+import httpx
+import openai
 from dotenv import load_dotenv
 import os
+import sys
+import time
+
+from openai_kit import TokenBucket, backoff_delays, default_cache, get_client, request_key, retry_after_seconds
 
 load_dotenv()
 
 
+class ImageResult(NamedTuple):
+    prompt: str
+    images: List[str]  # URLs, or base64 PNGs for response_format="b64_json"
+    paths: List[str]
+    error: Exception = None
+
+
 class ImageGenerator:
-    def __init__(self, api_key: str, model: str = "dall-e-3"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "dall-e-3", cache=None):
+        self.client = get_client(api_key)
         self.model = model
+        self.cache = cache
 
     def generate_image(self, prompt, size="1024x1024", quality="standard", n=1):
-        response = self.client.images.generate(
+        return self.generate_images(prompt, size, quality, n)[0]
+
+    def generate_images(self, prompt, size="1024x1024", quality="standard", n=1, response_format="url",
+                        client=None):
+        """every generated image: URLs, or base64 PNGs with response_format="b64_json" """
+        response = (client or self.client).images.generate(
             model=self.model,
             prompt=prompt,
             size=size,
             quality=quality,
-            n=n
+            n=n,
+            response_format=response_format
         )
-        return response.data[0].url
+        return [image.url if response_format == "url" else image.b64_json for image in response.data]
+
+    def generate_bulk(self, prompts, size="1024x1024", quality="standard", n=1, response_format="url",
+                      requests_per_minute=5, concurrency=8, download_dir=None, max_retries=5):
+        """generate images for many prompts as fast as the rate limit allows; returns ImageResults in prompt order.
+
+        Requests are spaced by a token bucket at requests_per_minute; a 429 pauses every
+        worker for the Retry-After the server asked for before the request is retried,
+        and a 5xx or connection error retries that prompt after an exponential backoff.
+        With download_dir, images are saved there as they arrive (<prompt index>_<n>.png).
+        A prompt that still fails after max_retries gets an ImageResult with its error.
+        """
+        bucket = TokenBucket(requests_per_minute)
+        # retries are scheduled through the bucket instead of the client's own backoff
+        client = self.client.with_options(max_retries=0)
+        if download_dir:
+            os.makedirs(download_dir, exist_ok=True)
+
+        def generate(prompt):
+            delays = backoff_delays(initial=1.0, maximum=30.0)
+            for attempt in range(max_retries + 1):
+                bucket.acquire()
+                try:
+                    return self.generate_images(prompt, size, quality, n, response_format, client)
+                except openai.RateLimitError as e:
+                    if attempt == max_retries:
+                        raise
+                    bucket.pause(retry_after_seconds(e.response.headers))
+                except (openai.InternalServerError, openai.APIConnectionError) as e:
+                    # transient: only this prompt backs off, then queues for the bucket again
+                    if attempt == max_retries:
+                        raise
+                    delay = next(delays)
+                    response = getattr(e, "response", None)
+                    time.sleep(delay if response is None else retry_after_seconds(response.headers, delay))
+
+        def save(http, index, number, image):
+            path = os.path.join(download_dir, f"{index:04d}_{number}.png")
+            if response_format == "url":
+                response = http.get(image)
+                response.raise_for_status()
+                data = response.content
+            else:
+                data = base64.b64decode(image)
+            with open(path, "wb") as f:
+                f.write(data)
+            return path
+
+        def job(index, prompt, http):
+            try:
+                images = generate(prompt)
+                paths = []
+                if download_dir:
+                    paths = [save(http, index, number, image) for number, image in enumerate(images)]
+            except Exception as e:
+                return ImageResult(prompt, [], [], e)
+            return ImageResult(prompt, images, paths)
+
+        with httpx.Client(timeout=60.0) as http, ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(lambda item: job(*item, http), enumerate(prompts)))
+
+    def generate_image_bytes(self, prompt, size="1024x1024", quality="standard"):
+        """PNG bytes of the generated image; identical requests are served from the cache.
+
+        Image URLs expire after an hour, so the image itself is what gets cached.
+        """
+        params = dict(model=self.model, prompt=prompt, size=size, quality=quality)
+
+        def generate():
+            response = self.client.images.generate(response_format="b64_json", n=1, **params)
+            return base64.b64decode(response.data[0].b64_json)
+
+        if self.cache is None:
+            return generate()
+        return self.cache.get_or_create(request_key(endpoint="images.generate", **params), generate)
+
+    def save_image(self, prompt, file_path, size="1024x1024", quality="standard"):
+        with open(file_path, "wb") as f:
+            f.write(self.generate_image_bytes(prompt, size, quality))
 
 
 def main():
     api_key = os.getenv("api_key")
-    image_generator = ImageGenerator(api_key)
+    image_generator = ImageGenerator(api_key, cache=default_cache())
+
+    if len(sys.argv) > 1:
+        # python gpt-dalle-gen-v1.py prompts.txt [output_dir]: one prompt per line
+        with open(sys.argv[1]) as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        output_dir = sys.argv[2] if len(sys.argv) > 2 else "images"
+        results = image_generator.generate_bulk(prompts, download_dir=output_dir)
+        for result in results:
+            print(f"{result.prompt}: {', '.join(result.paths) if result.error is None else result.error}")
+        return
 
     prompt = "a white siamese cat sitting in a spaceship"
-    image_url = image_generator.generate_image(prompt)
+    image_path = "siamese_cat.png"
+    image_generator.save_image(prompt, image_path)
 
-    print(image_url)
+    print(image_path)
 
 
 if __name__ == '__main__':
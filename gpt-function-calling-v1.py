@@ -1,126 +1,35 @@
-from openai import OpenAI
-import time
-import yfinance as yf
-from dotenv import load_dotenv
-import os
-import json
+from openai_kit import AssistantManager, QuoteBatcher, ToolDispatcher, cached_tool
 
-load_dotenv()
+tools = ToolDispatcher()
+# lookups from one run step (and from concurrent runs) share a single yfinance download
+quotes = QuoteBatcher()
 
 
+@tools.register(
+    description="Retrieve the latest closing price of a stock using its ticker symbol",
+    parameters={
+        "type": "object",
+        "properties": {
+            "symbol": {
+                "type": "string",
+                "description": "The ticker symbol of the stock"
+            }
+        },
+        "required": ["symbol"]
+    }
+)
+@cached_tool(ttl=60, key=lambda symbol: symbol.strip().upper())
 def get_stock_price(symbol: str) -> float:
-    stock = yf.Ticker(symbol)
-    price = stock.history(period="1d")['Close'].iloc[-1]
-    return price
-
-
-class AssistantManager:
-    def __init__(self, api_key, model="gpt-4-1106-preview"):
-        self.client = OpenAI(api_key=api_key)
-        self.model = model
-        self.assistant = None
-        self.thread = None
-        self.run = None
-
-    def create_assistant(self, name, instructions, tools):
-        self.assistant = self.client.beta.assistants.create(
-            name=name,
-            instructions=instructions,
-            tools=tools,
-            model=self.model
-        )
-
-    def create_thread(self):
-        self.thread = self.client.beta.threads.create()
-
-    def add_message_to_thread(self, role, content):
-        self.client.beta.threads.messages.create(
-            thread_id=self.thread.id,
-            role=role,
-            content=content
-        )
-
-    def run_assistant(self, instructions):
-        self.run = self.client.beta.threads.runs.create(
-            thread_id=self.thread.id,
-            assistant_id=self.assistant.id,
-            instructions=instructions
-        )
-
-    def wait_for_completion(self):
-        while True:
-            time.sleep(5)
-            run_status = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread.id,
-                run_id=self.run.id
-            )
-            print(run_status.model_dump_json(indent=4))
-
-            if run_status.status == 'completed':
-                self.process_messages()
-                break
-            elif run_status.status == 'requires_action':
-                print("Function Calling ...")
-                self.call_required_functions(run_status.required_action.submit_tool_outputs.model_dump())
-            else:
-                print("Waiting for the Assistant to process...")
-
-    def process_messages(self):
-        messages = self.client.beta.threads.messages.list(thread_id=self.thread.id)
-
-        for msg in messages.data:
-            role = msg.role
-            content = msg.content[0].text.value
-            print(f"{role.capitalize()}: {content}")
-
-    def call_required_functions(self, required_actions):
-        tool_outputs = []
-
-        for action in required_actions["tool_calls"]:
-            func_name = action['function']['name']
-            arguments = json.loads(action['function']['arguments'])
-
-            if func_name == "get_stock_price":
-                output = get_stock_price(symbol=arguments['symbol'])
-                tool_outputs.append({
-                    "tool_call_id": action['id'],
-                    "output": output
-                })
-            else:
-                raise ValueError(f"Unknown function: {func_name}")
-
-        print("Submitting outputs back to the Assistant...")
-        self.client.beta.threads.runs.submit_tool_outputs(
-            thread_id=self.thread.id,
-            run_id=self.run.id,
-            tool_outputs=tool_outputs
-        )
+    return quotes.get(symbol)
 
 
 def main():
-    api_key = os.getenv("api_key")
-    manager = AssistantManager(api_key)
+    manager = AssistantManager(tools=tools)
     # process 1
     manager.create_assistant(
         name="Data Analyst Assistant",
         instructions="You are a personal Data Analyst Assistant",
-        tools=[{
-            "type": "function",
-            "function": {
-                "name": "get_stock_price",
-                "description": "Retrieve the latest closing price of a stock using its ticker symbol",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "The ticker symbol of the stock"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            }
-        }]
+        tools=tools.definitions()
     )
     # process 2
     manager.create_thread()
@@ -1,30 +1,35 @@
 from typing import Literal
 
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 
+from openai_kit import SpeechSynthesizer, default_cache, get_client
+
 load_dotenv()
 
 
 class SpeechGenerator:
-    def __init__(self, api_key: str, model: str = "tts-1", voice="fable"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "tts-1", voice="fable", cache=None):
+        self.client = get_client(api_key)
         self.model = model
         self.voice = voice
+        self.cache = cache
+
+    def _synthesizer(self, concurrency):
+        return SpeechSynthesizer(self.client, self.model, self.voice, concurrency=concurrency, cache=self.cache)
+
+    def generate_speech(self, text, file_path, concurrency=4):
+        """synthesize sentence chunks concurrently, writing audio to file_path as it arrives"""
+        self._synthesizer(concurrency).stream_to_file(text, file_path)
 
-    def generate_speech(self, text, file_path):
-        response = self.client.audio.speech.create(
-            model=self.model,
-            voice=self.voice,
-            input=text
-        )
-        response.stream_to_file(file_path)
+    def iter_speech(self, text, concurrency=4):
+        """audio bytes for text, in order, as soon as each sentence chunk is ready"""
+        return self._synthesizer(concurrency).iter_audio(text)
 
 
 def main():
     api_key = os.getenv("api_key")
-    speech_generator = SpeechGenerator(api_key)
+    speech_generator = SpeechGenerator(api_key, cache=default_cache())
 
     text = "Hi Everyone, This is Donald Trump. I'm coming back to clean up the mess!"
     speech_file_path = "speech2.mp3"
@@ -1,17 +1,28 @@
 import cv2
-import base64
-from openai import OpenAI
 from moviepy.editor import VideoFileClip, AudioFileClip
 from dotenv import load_dotenv
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from openai_kit import SpeechSynthesizer, StreamStats, default_cache, astream_chat, get_async_client, get_client, stream_chat
+from openai_kit.video import (iter_base64_frames, iter_keyframes, parallel_base64_frames, parallel_keyframes,
+                              time_windows, window_base64_frames)
 
 load_dotenv()
 
 
+class VoiceoverSegment(NamedTuple):
+    index: int
+    start: float
+    end: float
+    script: str
+
+
 class VideoProcessor:
     def __init__(self, api_key: str, model: str = 'gpt-4-vision-preview'):
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.client = get_client(api_key)
         self.model = model
 
     def calculate_video_length(self, video):
@@ -20,42 +31,107 @@ class VideoProcessor:
         fps = video.get(cv2.CAP_PROP_FPS)
         return length / fps
 
-    def read_video_frames(self, video):
+    def iter_video_frames(self, video, stride=25, count=None, interval=None, resize=768):
+        """yield base64 JPEGs of only the sampled frames: every `stride` frames, `count`
+        evenly spaced frames, or one every `interval` seconds, downscaled to `resize` wide"""
+        return iter_base64_frames(video, stride=None if count or interval else stride, count=count,
+                                  interval=interval, resize=resize)
+
+    def read_video_frames(self, video, stride=25, count=None, interval=None, resize=768):
         """read video frames"""
-        base64_frames = []
-        while video.isOpened():
-            success, frame = video.read()
-            if not success:
-                break
-            _, buffer = cv2.imencode(".jpg", frame)
-            base64_frames.append(base64.b64encode(buffer).decode("utf-8"))
-        return base64_frames
+        return list(self.iter_video_frames(video, stride, count, interval, resize))
+
+    def read_keyframes(self, video, budget=20, scan_stride=5, resize=768):
+        """read at most `budget` frames chosen at scene changes and for visual variety"""
+        return list(iter_keyframes(video, budget, scan_stride=scan_stride, resize=resize))
+
+    def read_video_frames_parallel(self, video_path, stride=25, count=None, interval=None, resize=768,
+                                   workers=None):
+        """read_video_frames with decoding and encoding split over `workers` processes"""
+        return list(parallel_base64_frames(video_path, stride=None if count or interval else stride, count=count,
+                                           interval=interval, resize=resize, workers=workers))
+
+    def read_keyframes_parallel(self, video_path, budget=20, scan_stride=5, resize=768, workers=None):
+        """read_keyframes with decoding and encoding split over `workers` processes"""
+        return list(parallel_keyframes(video_path, budget, scan_stride=scan_stride, resize=resize, workers=workers))
+
+    def _voiceover_messages(self, video_length, base64_frames):
+        return [
+            {
+                "role": "user",
+                "content": [
+                    f"These are frames of a video. Create a short voiceover script in the style of a football commentator for {video_length:.2f} seconds. Only include the narration. Don't talk about the view",
+                    *map(lambda x: {"image": x, "resize": 768}, base64_frames),
+                ]
+            }
+        ]
 
     def create_voiceover_script(self, video_length, base64_frames):
         """create voice over"""
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        f"These are frames of a video. Create a short voiceover script in the style of a football commentator for {video_length:.2f} seconds. Only include the narration. Don't talk about the view",
-                        *map(lambda x: {"image": x, "resize": 768}, base64_frames[0::25]),
-                    ]
-                }
-            ],
+            messages=self._voiceover_messages(video_length, base64_frames),
             max_tokens=500,
         )
         return response.choices[0].message.content
 
-    def generate_audio_file(self, model, voice, text, file_path):
-        """generate audio file"""
-        response = self.client.audio.speech.create(
-            model=model,
-            voice=voice,
-            input=text
-        )
-        response.stream_to_file(file_path)
+    def _window_messages(self, video_length, context_start, start, end, base64_frames):
+        context = ""
+        if context_start < start:
+            context = (f" The frames before {start:.1f}s are only context from the previous part; do not narrate them."
+                       " Continue the commentary as if it were already under way.")
+        return [
+            {
+                "role": "user",
+                "content": [
+                    f"These are frames from {context_start:.1f}s to {end:.1f}s of a {video_length:.1f} second video. Create a short voiceover script in the style of a football commentator for the {end - start:.1f} seconds from {start:.1f}s to {end:.1f}s. Only include the narration. Don't talk about the view.{context}",
+                    *map(lambda x: {"image": x, "resize": 768}, base64_frames),
+                ]
+            }
+        ]
+
+    def create_windowed_voiceover(self, video_path, window=30.0, overlap=3.0, frames_per_window=12,
+                                  concurrency=4, resize=768):
+        """narrate a long video in `window`-second chunks, at most `concurrency` requests at a time.
+
+        Each chunk also sees `overlap` seconds of the previous one for continuity.
+        Returns VoiceoverSegments in video order; join their scripts for the full narration.
+        """
+        video = cv2.VideoCapture(video_path)
+        video_length = self.calculate_video_length(video)
+        video.release()
+
+        def narrate(index, context_start, start, end):
+            base64_frames = window_base64_frames(video_path, context_start, end, frames_per_window, resize=resize)
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._window_messages(video_length, context_start, start, end, base64_frames),
+                max_tokens=500,
+            )
+            return VoiceoverSegment(index, start, end, response.choices[0].message.content)
+
+        windows = time_windows(video_length, window, overlap)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(narrate, index, *bounds) for index, bounds in enumerate(windows)]
+            return [future.result() for future in futures]
+
+    def stream_voiceover_script(self, video_length, base64_frames, stats: StreamStats = None):
+        """yield the voice over script as it is generated"""
+        return stream_chat(self.client, stats, model=self.model,
+                           messages=self._voiceover_messages(video_length, base64_frames), max_tokens=500)
+
+    async def astream_voiceover_script(self, video_length, base64_frames, stats: StreamStats = None):
+        """async iterator over the voice over script as it is generated"""
+        # the client is looked up once iteration starts, on the loop that will use it
+        async for text in astream_chat(get_async_client(self.api_key), stats, model=self.model,
+                                       messages=self._voiceover_messages(video_length, base64_frames),
+                                       max_tokens=500):
+            yield text
+
+    def generate_audio_file(self, model, voice, text, file_path, concurrency=4):
+        """generate audio file, synthesizing sentence chunks concurrently"""
+        synthesizer = SpeechSynthesizer(self.client, model, voice, concurrency=concurrency, cache=default_cache())
+        synthesizer.stream_to_file(text, file_path)
 
 
 def main():
@@ -68,12 +144,24 @@ def main():
     video_length_seconds = video_processor.calculate_video_length(video)
     print(f'Video length: {video_length_seconds:.2f} seconds')
 
-    base64_frames = video_processor.read_video_frames(video)
     video.release()
-    print(len(base64_frames), "frames read.")
 
-    voiceover_script = video_processor.create_voiceover_script(video_length_seconds,
-                                                               base64_frames)
+    if video_length_seconds > 60:
+        # long footage: narrate 30s windows concurrently instead of one oversized request
+        segments = video_processor.create_windowed_voiceover(video_path)
+        for segment in segments:
+            print(f"[{segment.start:6.1f}s - {segment.end:6.1f}s] {segment.script}")
+        voiceover_script = "\n".join(segment.script for segment in segments)
+    else:
+        # windowed mode reads its own frames, so keyframes are only scanned for short footage
+        base64_frames = video_processor.read_keyframes_parallel(video_path)
+        print(len(base64_frames), "frames read.")
+        stats = StreamStats()
+        voiceover_script = ""
+        for text in video_processor.stream_voiceover_script(video_length_seconds, base64_frames, stats):
+            print(text, end="", flush=True)
+            voiceover_script += text
+        print(f"\n{stats}")
     time.sleep(2)  # Ensure a brief pause between chat completion and audio generation
 
     speech_file_path = "football.mp3"
@@ -1,29 +1,121 @@
-from openai import OpenAI
 from dotenv import load_dotenv
+import json
 import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from openai_kit import JobManifest, get_client
+from openai_kit.audio import MAX_UPLOAD_BYTES, SegmentedTranscriber, probe_duration
 
 load_dotenv()
 
+AUDIO_EXTENSIONS = (".flac", ".m4a", ".mp3", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".wav", ".webm")
+
 
 class AudioTranscriber:
-    def __init__(self, api_key: str, model: str = "whisper-1"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "whisper-1", segment_seconds: float = 300):
+        self.client = get_client(api_key)
         self.model = model
+        self.segment_seconds = segment_seconds
 
     def transcribe_audio_file(self, file_path):
-        """transcribe audio file to text"""
+        """transcribe audio file to text; long recordings and files over the upload limit are transcribed in segments"""
+        return self._transcribe(file_path)[0]
+
+    def _is_long(self, file_path):
+        if os.path.getsize(file_path) > MAX_UPLOAD_BYTES:
+            return True
+        # compressed recordings of an hour or more often fit in one upload but transcribe far faster in parallel
+        duration = probe_duration(file_path)
+        return duration is not None and duration > 1.5 * self.segment_seconds
+
+    def _transcribe(self, file_path):
+        """(text, audio seconds)"""
+        if self._is_long(file_path):
+            transcript = self.transcribe_long_audio_file(file_path, self.segment_seconds)
+            return transcript.text, transcript.duration
         with open(file_path, "rb") as audio_file:
             transcript = self.client.audio.transcriptions.create(
                 model=self.model,
-                file=audio_file
+                file=audio_file,
+                response_format="verbose_json"
             )
-        return transcript.text
+        return transcript.text, getattr(transcript, "duration", None) or 0.0
+
+    def transcribe_long_audio_file(self, file_path, segment_seconds=300, concurrency=8):
+        """transcribe audio split at pauses, segments in parallel; returns text and timestamped segments"""
+        transcriber = SegmentedTranscriber(self.client, self.model, segment_seconds=segment_seconds,
+                                           concurrency=concurrency)
+        return transcriber.transcribe(file_path)
+
+    def transcribe_directory(self, directory, output_path, manifest_path=None, concurrency=8):
+        """transcribe every audio file under directory, appending one JSON line per file to output_path.
+
+        Progress is kept in a JobManifest (output_path + ".manifest" by default), so a rerun
+        after a crash only transcribes files that are new, changed or failed. A line is
+        written before its file is marked done, so a crash in between can repeat a path in
+        the output; the last line for a path wins. Returns throughput stats.
+        """
+        manifest = JobManifest(manifest_path or output_path + ".manifest")
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(directory) for name in names
+                       if name.lower().endswith(AUDIO_EXTENSIONS))
+        pending = manifest.pending(paths)
+        stats = {"files": 0, "failed": 0, "skipped": len(paths) - len(pending), "audio_seconds": 0.0}
+        started = time.perf_counter()
+
+        def transcribe(path):
+            file_started = time.perf_counter()
+            text, duration = self._transcribe(path)
+            return {"path": path, "text": text, "duration": duration,
+                    "elapsed": round(time.perf_counter() - file_started, 3)}
+
+        with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=concurrency) as pool:
+            queue, running = iter(pending), {}
+            while True:
+                # keep at most 2 x concurrency files in flight rather than queueing the whole directory
+                for path in queue:
+                    running[pool.submit(transcribe, path)] = path
+                    if len(running) >= 2 * concurrency:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Failed to transcribe {path}: {e}")
+                        manifest.mark_failed(path, e)
+                        stats["failed"] += 1
+                        continue
+                    output.write(json.dumps(result) + "\n")
+                    output.flush()
+                    manifest.mark_done(path)
+                    stats["files"] += 1
+                    stats["audio_seconds"] += result["duration"]
+        manifest.close()
+
+        stats["elapsed"] = time.perf_counter() - started
+        stats["files_per_minute"] = stats["files"] / stats["elapsed"] * 60 if stats["elapsed"] else 0.0
+        stats["audio_seconds_per_second"] = stats["audio_seconds"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        return stats
 
 
 def main():
     api_key = os.getenv("api_key")
     transcriber = AudioTranscriber(api_key)
 
+    if len(sys.argv) > 1:
+        # python gpt-whisper-v1.py <directory> [output.jsonl]
+        output_path = sys.argv[2] if len(sys.argv) > 2 else "transcripts.jsonl"
+        stats = transcriber.transcribe_directory(sys.argv[1], output_path)
+        print(f"{stats['files']} files transcribed, {stats['failed']} failed, {stats['skipped']} already done "
+              f"in {stats['elapsed']:.1f}s: {stats['files_per_minute']:.1f} files/min, "
+              f"{stats['audio_seconds_per_second']:.1f} audio-seconds/sec")
+        return
+
     audio_file_path = "speech.mp3"
     transcript_text = transcriber.transcribe_audio_file(audio_file_path)
 
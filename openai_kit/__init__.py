@@ -0,0 +1,18 @@
+from openai_kit.async_manager import AsyncAssistantManager, ConversationResult
+from openai_kit.batch import (BatchError, BatchPipeline, chat_request, chunk_requests, join_results,
+                               result_content)
+from openai_kit.blobcache import BlobCache, default_cache, request_key
+from openai_kit.cache import ToolCache, cache_stats, cached_tool
+from openai_kit.client import aclose_async_clients, close_clients, get_api_key, get_async_client, get_client
+from openai_kit.manager import AssistantManager
+from openai_kit.manifest import JobManifest
+from openai_kit.messages import AsyncMessageReader, MessageReader
+from openai_kit.quotes import QuoteBatcher, yfinance_closing_prices
+from openai_kit.ratelimit import TokenBucket, retry_after_seconds
+from openai_kit.registry import ResourceRegistry
+from openai_kit.speech import SpeechSynthesizer, split_sentences
+from openai_kit.streaming import StreamStats, astream_chat, stream_chat
+from openai_kit.tools import ToolDispatcher
+from openai_kit.waiter import (AsyncRunWaiter, RunError, RunTimeoutError, RunWaiter, TERMINAL_STATUSES,
+                               backoff_delays)
+from openai_kit.weather import AsyncWeatherClient, WeatherClient, WeatherError
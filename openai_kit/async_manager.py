@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import NamedTuple
+
+from openai_kit.client import get_async_client
+from openai_kit.messages import AsyncMessageReader
+from openai_kit.registry import ResourceRegistry
+from openai_kit.tools import ToolDispatcher
+from openai_kit.waiter import TERMINAL_STATUSES, AsyncRunWaiter, RunTimeoutError
+
+# extra time ask_many allows a timed-out conversation to cancel its run before abandoning it
+CANCEL_GRACE = 10.0
+
+
+class ConversationResult(NamedTuple):
+    index: int
+    question: str
+    answer: str = None
+    error: BaseException = None
+    elapsed: float = 0.0
+
+
+class AsyncAssistantManager:
+    """AssistantManager on AsyncOpenAI, for driving many conversations from one event loop"""
+
+    def __init__(self, client=None, model: str = "gpt-4-1106-preview", waiter: AsyncRunWaiter = None,
+                 registry: ResourceRegistry = None, tools: ToolDispatcher = None, answer_cache=None):
+        self.client = client or get_async_client()
+        self.model = model
+        self.waiter = waiter or AsyncRunWaiter(self.client)
+        self.registry = registry
+        self.tools = tools
+        self.answer_cache = answer_cache
+        self.messages = AsyncMessageReader(self.client)
+        self.file_ids = []
+        self.assistant = None
+
+    async def create_file(self, file_path, purpose='assistants'):
+        file_id = None
+        if self.registry:
+            content_hash, file_id = self.registry.lookup_file(file_path, purpose)
+        if file_id is None:
+            with open(file_path, "rb") as file:
+                file_id = (await self.client.files.create(file=file, purpose=purpose)).id
+            if self.registry:
+                self.registry.record_file(content_hash, file_path, file_id, purpose)
+        self.file_ids.append(file_id)
+        return file_id
+
+    async def create_assistant(self, name, instructions, tools):
+        if self.registry:
+            config_hash, self.assistant = self.registry.lookup_assistant(
+                name, instructions, tools, self.model, self.file_ids)
+            if self.assistant is not None:
+                return self.assistant
+
+        kwargs = {"file_ids": self.file_ids} if self.file_ids else {}
+        self.assistant = await self.client.beta.assistants.create(
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            model=self.model,
+            **kwargs
+        )
+        if self.registry:
+            self.registry.record_assistant(config_hash, self.assistant)
+        return self.assistant
+
+    async def create_thread(self):
+        return await self.client.beta.threads.create()
+
+    async def add_message_to_thread(self, thread_id, role, content):
+        return await self.client.beta.threads.messages.create(
+            thread_id=thread_id,
+            role=role,
+            content=content
+        )
+
+    async def process_messages(self, thread_id):
+        """return the messages added to the thread since the last call, oldest first"""
+        return [message async for message in self.messages.new_messages(thread_id)]
+
+    async def call_required_functions(self, run):
+        """return the tool outputs for a requires_action run using the tools dispatcher"""
+        if self.tools is None:
+            names = [call.function.name for call in run.required_action.submit_tool_outputs.tool_calls]
+            raise ValueError(f"Unknown function: {', '.join(names)}")
+        return await self.tools.acall(run)
+
+    async def ask(self, content, instructions=None, thread_id=None, timeout: float = None):
+        """run one question (on a new thread unless thread_id is given) and return the reply text.
+
+        timeout (seconds, default the waiter's) bounds the whole call. A run that
+        outlives it, or whose caller is cancelled, is cancelled server-side before the
+        error propagates. Questions on new threads go through answer_cache when set.
+        """
+        deadline = None if timeout is None else self.waiter.clock() + timeout
+        if self.answer_cache is not None and thread_id is None:
+            return await self.answer_cache.aget_or_ask(content, lambda: self._ask(content, instructions,
+                                                                                  deadline=deadline),
+                                                       context=(self.assistant.id, instructions))
+        return await self._ask(content, instructions, thread_id, deadline)
+
+    async def _cancel_active_run(self, thread_id):
+        """cancel the latest run of thread_id if it is still going"""
+        runs = await self.client.beta.threads.runs.list(thread_id=thread_id, limit=1)
+        for run in runs.data:
+            if run.status not in TERMINAL_STATUSES:
+                await self.client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+
+    async def _ask(self, content, instructions=None, thread_id=None, deadline=None):
+        if thread_id is None:
+            thread_id = (await self.create_thread()).id
+        await self.add_message_to_thread(thread_id, "user", content)
+        kwargs = {"instructions": instructions} if instructions else {}
+        try:
+            await self.waiter.run(thread_id, self.assistant.id,
+                                  on_requires_action=self.call_required_functions, deadline=deadline, **kwargs)
+        except RunTimeoutError as e:
+            await self.client.beta.threads.runs.cancel(thread_id=thread_id, run_id=e.run.id)
+            raise
+        except asyncio.CancelledError:
+            # the run id is not known here, so stop whatever run the thread has going; shielded so
+            # the cancel request is still sent while this task unwinds
+            try:
+                await asyncio.shield(self._cancel_active_run(thread_id))
+            except Exception:
+                pass  # best effort: the cancellation itself must still propagate
+            raise
+        messages = await self.client.beta.threads.messages.list(thread_id=thread_id, order="desc", limit=1)
+        return messages.data[0].content[0].text.value
+
+    async def ask_many(self, questions, instructions=None, concurrency: int = 50, timeout: float = None):
+        """answer many questions at once, yielding ConversationResults as they complete.
+
+        At most `concurrency` conversations are in flight; each gets `timeout` seconds
+        end to end, after which its run is cancelled. Failures are yielded as results with `error` set rather than raised,
+        so one bad conversation does not stop the rest.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def answer(index, question):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    # the waiter times the run out first and cancels it; wait_for is only a backstop
+                    backstop = None if timeout is None else timeout + CANCEL_GRACE
+                    text = await asyncio.wait_for(self.ask(question, instructions, timeout=timeout), backstop)
+                except (Exception, asyncio.CancelledError) as e:
+                    # a CancelledError from ask (e.g. re-raised by a shared answer) is this conversation's error
+                    return ConversationResult(index, question, error=e, elapsed=time.perf_counter() - start)
+                return ConversationResult(index, question, answer=text, elapsed=time.perf_counter() - start)
+
+        tasks = [asyncio.ensure_future(answer(index, question)) for index, question in enumerate(questions)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
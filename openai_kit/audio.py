@@ -0,0 +1,200 @@
+import io
+import os
+import re
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+import numpy as np
+
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE = os.getenv("FFPROBE_BINARY", "ffprobe")
+SAMPLE_RATE = 16000
+# audio.transcriptions.create rejects uploads over 25 MB
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+
+class TranscriptSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+
+class Transcript(NamedTuple):
+    text: str
+    segments: List[TranscriptSegment]
+    duration: float
+
+
+def _read_wav(path, sample_rate):
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            return None
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        channels, rate = f.getnchannels(), f.getframerate()
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate:
+        positions = np.arange(0, len(samples), rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+def decode_audio(path, sample_rate=SAMPLE_RATE):
+    """mono 16-bit samples of an audio file; 16-bit WAV is read directly, anything else through ffmpeg"""
+    if path.lower().endswith(".wav"):
+        samples = _read_wav(path, sample_rate)
+        if samples is not None:
+            return samples
+    result = subprocess.run([FFMPEG, "-nostdin", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1",
+                             "-ar", str(sample_rate), "-"], capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def probe_duration(path):
+    """length of an audio file in seconds, read from its header; None if it cannot be probed"""
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as f:
+                return f.getnframes() / f.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    try:
+        result = subprocess.run([FFPROBE, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                                capture_output=True, check=True, text=True)
+        return float(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def wav_bytes(samples, sample_rate=SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def frame_energy(samples, sample_rate, frame_seconds=0.03, smooth_seconds=0.3):
+    """RMS energy per frame, averaged over smooth_seconds so short gaps between syllables don't look like pauses"""
+    size = max(1, int(sample_rate * frame_seconds))
+    count = len(samples) // size
+    frames = samples[:count * size].astype(np.float32).reshape(count, size)
+    energy = np.sqrt((frames ** 2).mean(axis=1))
+    width = max(1, int(smooth_seconds / frame_seconds))
+    return np.convolve(energy, np.ones(width, np.float32) / width, mode="same")
+
+
+def split_at_silence(samples, sample_rate, segment_seconds=300.0, search_seconds=20.0, frame_seconds=0.03):
+    """sample offsets splitting the audio into segments of at most segment_seconds.
+
+    Each cut is placed at the quietest point in the last search_seconds before the
+    segment would exceed its length. Returns [0, cut, ..., len(samples)].
+    """
+    energy = frame_energy(samples, sample_rate, frame_seconds)
+    frame = max(1, int(sample_rate * frame_seconds))
+    segment_frames = max(1, int(segment_seconds / frame_seconds))
+    search_frames = max(1, int(search_seconds / frame_seconds))
+    boundaries, position = [0], 0
+    while len(samples) - position * frame > segment_frames * frame:
+        target = position + segment_frames
+        low = max(position + 1, target - search_frames)
+        cut = low + int(energy[low:target + 1].argmin())
+        boundaries.append(cut * frame)
+        position = cut
+    boundaries.append(len(samples))
+    return boundaries
+
+
+def _normalise(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlap(previous, following, max_words=30):
+    """following without the leading words that repeat the end of previous"""
+    previous_words = [_normalise(word) for word in previous.split()[-max_words:]]
+    words = following.split()
+    normalised = [_normalise(word) for word in words[:max_words]]
+    for n in range(min(len(previous_words), len(normalised)), 0, -1):
+        if previous_words[-n:] == normalised[:n]:
+            return " ".join(words[n:])
+    return following
+
+
+def _field(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+class SegmentedTranscriber:
+    """whisper transcription of recordings of any length.
+
+    The audio is decoded once, cut at quiet points into segments of at most
+    segment_seconds (each padded with overlap_seconds of its neighbours so words at
+    a cut are heard whole), and up to `concurrency` segments are transcribed at once.
+    Whisper's segment timestamps are shifted to the position in the recording; only
+    segments centred inside their own cut range are kept, and words repeated across
+    a cut are dropped.
+    """
+
+    def __init__(self, client, model: str = "whisper-1", segment_seconds: float = 300.0,
+                 overlap_seconds: float = 1.0, search_seconds: float = 20.0, concurrency: int = 8,
+                 sample_rate: int = SAMPLE_RATE, language: str = None):
+        self.client = client
+        self.model = model
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.concurrency = concurrency
+        self.sample_rate = sample_rate
+        self.language = language
+
+    def _transcribe_segment(self, index, samples, offset, start, end):
+        """TranscriptSegments of one padded segment that fall within [start, end) of the recording"""
+        extra = {"language": self.language} if self.language else {}
+        response = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=(f"segment_{index:04d}.wav", wav_bytes(samples, self.sample_rate)),
+            response_format="verbose_json",
+            **extra
+        )
+        segments = getattr(response, "segments", None)
+        if not segments:
+            return [TranscriptSegment(start, end, response.text.strip())] if response.text.strip() else []
+        kept = []
+        for segment in segments:
+            segment_start = offset + _field(segment, "start")
+            segment_end = offset + _field(segment, "end")
+            if start <= (segment_start + segment_end) / 2 < end:
+                kept.append(TranscriptSegment(segment_start, segment_end, _field(segment, "text").strip()))
+        return kept
+
+    def transcribe(self, file_path) -> Transcript:
+        samples = decode_audio(file_path, self.sample_rate)
+        rate = self.sample_rate
+        # 16-bit mono WAV: keep every padded segment under the upload limit
+        longest = (MAX_UPLOAD_BYTES - 1024) / (2 * rate) - 2 * self.overlap_seconds
+        boundaries = split_at_silence(samples, rate, min(self.segment_seconds, longest), self.search_seconds)
+        padding = int(self.overlap_seconds * rate)
+        tasks = []
+        for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+            first, last = max(0, start - padding), min(len(samples), end + padding)
+            tasks.append((index, samples[first:last], first / rate, start / rate, end / rate))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(lambda task: self._transcribe_segment(*task), tasks))
+
+        merged, text = [], ""
+        for segments in results:
+            for segment in segments:
+                segment_text = segment.text
+                if merged and segment.start < merged[-1].end:
+                    # heard by both sides of a cut
+                    segment_text = merge_overlap(merged[-1].text, segment_text)
+                if not segment_text:
+                    continue
+                merged.append(segment._replace(text=segment_text))
+                text = f"{text} {segment_text}" if text else segment_text
+        return Transcript(text, merged, len(samples) / rate)
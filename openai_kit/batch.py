@@ -0,0 +1,148 @@
+import io
+import json
+import time
+
+from openai_kit.waiter import backoff_delays
+
+CHAT_COMPLETIONS = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# the Batch API accepts at most 50,000 requests and 200 MB per input file
+MAX_REQUESTS_PER_BATCH = 50000
+MAX_BYTES_PER_BATCH = 190 * 1024 * 1024
+
+
+class BatchError(RuntimeError):
+    """raised when a batch ends in a terminal state other than completed"""
+
+    def __init__(self, batch, message=None):
+        self.batch = batch
+        errors = (batch.get("errors") or {}).get("data") or []
+        detail = "; ".join(error.get("message", "") for error in errors)
+        super().__init__(message or f"Batch {batch['id']} ended with status '{batch['status']}'"
+                         + (f": {detail}" if detail else ""))
+
+
+def chat_request(custom_id, messages, model, **params):
+    """one line of a Batch API input file"""
+    return {"custom_id": str(custom_id), "method": "POST", "url": CHAT_COMPLETIONS,
+            "body": {"model": model, "messages": messages, **params}}
+
+
+def chunk_requests(requests, max_requests=MAX_REQUESTS_PER_BATCH, max_bytes=MAX_BYTES_PER_BATCH):
+    """group requests into JSONL payloads (bytes) that each fit in one batch"""
+    lines, size = [], 0
+    for request in requests:
+        line = (json.dumps(request) + "\n").encode()
+        if lines and (len(lines) >= max_requests or size + len(line) > max_bytes):
+            yield b"".join(lines)
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line)
+    if lines:
+        yield b"".join(lines)
+
+
+def _as_dict(obj):
+    return obj if isinstance(obj, dict) else obj.model_dump()
+
+
+class BatchPipeline:
+    """run chat completions through the Batch API instead of one request at a time.
+
+    submit() uploads JSONL inputs (split across several batches when they exceed the
+    per-batch limits), wait() polls each batch with exponential backoff, and results()
+    streams the output and error files line by line. SDKs without client.batches
+    are driven through the raw /batches endpoints.
+    """
+
+    def __init__(self, client, endpoint: str = CHAT_COMPLETIONS, completion_window: str = "24h",
+                 initial_delay: float = 5.0, max_delay: float = 300.0, timeout: float = 26 * 3600,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.client = client
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.sleep = sleep
+        self.clock = clock
+
+    # raw endpoints for SDKs that predate the Batch API
+
+    def _create(self, **params):
+        if hasattr(self.client, "batches"):
+            return _as_dict(self.client.batches.create(**params))
+        return self.client.post("/batches", body=params, cast_to=object)
+
+    def _retrieve(self, batch_id):
+        if hasattr(self.client, "batches"):
+            return _as_dict(self.client.batches.retrieve(batch_id))
+        return self.client.get(f"/batches/{batch_id}", cast_to=object)
+
+    def cancel(self, batch_id):
+        if hasattr(self.client, "batches"):
+            return _as_dict(self.client.batches.cancel(batch_id))
+        return self.client.post(f"/batches/{batch_id}/cancel", cast_to=object)
+
+    def submit(self, requests, metadata=None):
+        """upload requests and create batches for them; returns the batch ids"""
+        batch_ids = []
+        for index, payload in enumerate(chunk_requests(requests)):
+            file = self.client.files.create(file=(f"batch_input_{index:03d}.jsonl", io.BytesIO(payload)),
+                                            purpose="batch")
+            batch = self._create(input_file_id=file.id, endpoint=self.endpoint,
+                                 completion_window=self.completion_window, metadata=metadata)
+            lines = payload.count(b"\n")
+            print(f"Submitted batch {batch['id']} ({lines} requests)")
+            batch_ids.append(batch["id"])
+        return batch_ids
+
+    def wait(self, batch_id):
+        """poll until the batch finishes; returns it, or raises BatchError if it did not complete"""
+        deadline = self.clock() + self.timeout
+        delays = backoff_delays(self.initial_delay, self.max_delay)
+        while True:
+            batch = self._retrieve(batch_id)
+            if batch["status"] in BATCH_TERMINAL_STATUSES:
+                break
+            if self.clock() >= deadline:
+                raise BatchError(batch, f"Batch {batch_id} still '{batch['status']}' after {self.timeout:.0f}s")
+            self.sleep(next(delays))
+        if batch["status"] != "completed":
+            raise BatchError(batch)
+        return batch
+
+    def _lines(self, file_id):
+        with self.client.files.with_streaming_response.content(file_id) as response:
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def results(self, batch):
+        """yield every result line of a finished batch: successes first, then per-request errors"""
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if file_id:
+                yield from self._lines(file_id)
+
+    def run(self, requests, metadata=None):
+        """submit, wait for and stream the results of requests, one batch after another"""
+        for batch_id in self.submit(requests, metadata):
+            yield from self.results(self.wait(batch_id))
+
+
+def result_content(result):
+    """the assistant reply of a chat completion result line, or None if the request failed"""
+    response = result.get("response")
+    if result.get("error") or not response or response.get("status_code") != 200:
+        return None
+    return response["body"]["choices"][0]["message"]["content"]
+
+
+def join_results(inputs, results):
+    """yield (input, result) for each result, looking the input up by custom_id.
+
+    inputs maps custom_id to whatever produced the request; results arrive in the
+    order the service wrote them, which is not the input order.
+    """
+    for result in results:
+        yield inputs.get(result["custom_id"]), result
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_DIR = os.getenv("OPENAI_CACHE_DIR", ".openai_cache")
+
+
+def request_key(**params):
+    """sha256 of the request parameters, independent of their order"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class BlobCache:
+    """content-addressed on-disk cache of generated outputs (audio, images, text).
+
+    Entries are files named by request_key() under `directory`, written to a
+    temporary file and renamed into place so readers never see partial data.
+    Reads refresh a file's mtime; once the directory grows past max_bytes the
+    least recently used files are deleted down to 90% of it. With memory_bytes,
+    recently used entries are also kept in an in-process LRU of that total size.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = 1 << 30, memory_bytes: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._disk_size = sum(size for _, size, _ in self._entries())
+
+    def stats(self):
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "disk_bytes": self._disk_size, "memory_bytes": self._memory_size}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self):
+        """(mtime, size, path) of every cached file"""
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def _remember(self, key, data):
+        """add to the memory tier; caller holds the lock"""
+        if len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def get(self, key):
+        """cached bytes for key, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # under the lock so concurrent puts of one key each see the size they replace
+            with self._lock:
+                try:
+                    replaced = os.path.getsize(path)
+                except OSError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                self._remember(key, data)
+                self._disk_size += len(data) - replaced
+                over = self._disk_size > self.max_bytes
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        if over:
+            self.evict()
+
+    def get_or_create(self, key, create):
+        """cached bytes for key, or create() stored under key"""
+        data = self.get(key)
+        if data is None:
+            data = create()
+            self.put(key, data)
+        return data
+
+    def evict(self):
+        """delete least recently used files until the cache is below 90% of max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_size = total
+            self.evictions += evicted
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        for _, _, path in list(self._entries()):
+            os.unlink(path)
+        with self._lock:
+            self._disk_size = 0
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """process-wide BlobCache in DEFAULT_DIR with a 64 MB memory tier"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BlobCache(memory_bytes=64 << 20)
+        return _default
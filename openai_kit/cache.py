@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import inspect
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+CACHES = {}
+
+
+def _default_key(args, kwargs):
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+class ToolCache:
+    """in-memory LRU cache with a TTL and single-flight coalescing.
+
+    Concurrent misses for the same key share one upstream call: the first caller
+    fetches, the others wait for its result (counted as `coalesced`). With `path`,
+    entries are also written to a SQLite file and survive restarts until they expire;
+    expired rows are deleted whenever a new value is stored. None results and exceptions are never cached.
+    """
+
+    def __init__(self, name, ttl: float = 60.0, max_entries: int = 1024, path: str = None, clock=time.time):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute("CREATE TABLE IF NOT EXISTS tool_cache "
+                                 "(name TEXT, key TEXT, value BLOB, expires_at REAL, PRIMARY KEY (name, key))")
+        CACHES[name] = self
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "evictions": self.evictions, "size": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                with self._db:
+                    self._db.execute("DELETE FROM tool_cache WHERE name = ?", (self.name,))
+
+    def _lookup(self, key):
+        """return (found, value); caller holds the lock"""
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                return True, entry[0]
+            del self._entries[key]
+        if self._db:
+            row = self._db.execute("SELECT value, expires_at FROM tool_cache WHERE name = ? AND key = ?",
+                                   (self.name, key)).fetchone()
+            if row and row[1] > now:
+                value = pickle.loads(row[0])
+                self._insert(key, value, row[1])
+                return True, value
+        return False, None
+
+    def _insert(self, key, value, expires_at):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key, value):
+        if value is None:
+            return
+        now = self.clock()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._insert(key, value, expires_at)
+            if self._db:
+                with self._db:
+                    self._db.execute("INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?)",
+                                     (self.name, key, pickle.dumps(value), expires_at))
+                    # expired rows are never read again; drop them so the file does not grow forever
+                    self._db.execute("DELETE FROM tool_cache WHERE name = ? AND expires_at <= ?",
+                                     (self.name, now))
+
+    def get_or_call(self, key, func, *args, **kwargs):
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            value = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    async def aget_or_call(self, key, func, *args, **kwargs):
+        """get_or_call for a coroutine function.
+
+        In-flight calls are shared through a concurrent.futures.Future rather than a
+        task, so callers on other event loops (ToolDispatcher runs each coroutine tool
+        in its own asyncio.run) can wait for them too.
+        """
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self.misses += 1
+                    future = self._inflight[key] = Future()
+                else:
+                    self.coalesced += 1
+            if waiting is None:
+                break
+            try:
+                # shielded so that cancelling this caller does not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(waiting))
+            except asyncio.CancelledError:
+                if not waiting.cancelled():
+                    raise
+                # the caller making the call was cancelled; make it ourselves
+
+        try:
+            value = await func(*args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+def cached_tool(ttl: float = 60.0, max_entries: int = 1024, path: str = None, key=None, name=None):
+    """cache a tool function's results; works for plain and coroutine functions.
+
+    key(*args, **kwargs) may normalise arguments (e.g. upper-case ticker symbols);
+    the wrapped function exposes its ToolCache as `.cache`.
+    """
+    def decorator(func):
+        cache = ToolCache(name or func.__qualname__, ttl=ttl, max_entries=max_entries, path=path)
+
+        def make_key(args, kwargs):
+            return key(*args, **kwargs) if key else _default_key(args, kwargs)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await cache.aget_or_call(make_key(args, kwargs), func, *args, **kwargs)
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_call(make_key(args, kwargs), func, *args, **kwargs)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """hit/miss/coalesced counters for every tool cache in the process"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
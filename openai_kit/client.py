@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+# Pool settings shared by every script; override through the environment (or .env).
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+TIMEOUT = httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT", "600")), connect=5.0)
+
+_clients = {}
+_async_clients = {}  # event loop (None outside one) -> {(api_key, base_url): client}
+_lock = threading.Lock()
+
+
+def get_api_key():
+    """read the api key from .env / the environment"""
+    return os.getenv("api_key") or os.getenv("OPENAI_API_KEY")
+
+
+def pool_limits(max_connections=None, max_keepalive_connections=None, keepalive_expiry=None):
+    return httpx.Limits(
+        max_connections=max_connections or MAX_CONNECTIONS,
+        max_keepalive_connections=max_keepalive_connections or MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=keepalive_expiry or KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client(api_key: str = None, base_url: str = None, **limits) -> OpenAI:
+    """return the process-wide OpenAI client for api_key, creating it on first use.
+
+    All callers share one keep-alive connection pool, so TLS handshakes are paid once
+    per connection rather than once per script object. `limits` are passed to
+    pool_limits and only apply when the client is first created.
+    """
+    api_key = api_key or get_api_key()
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = httpx.Client(limits=pool_limits(**limits), timeout=TIMEOUT)
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            _clients[key] = client
+    return client
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_async_client(api_key: str = None, base_url: str = None, **limits) -> AsyncOpenAI:
+    """AsyncOpenAI counterpart of get_client, shared per event loop.
+
+    An async connection pool only works on the loop it was first used on, so each
+    running loop (e.g. each asyncio.run) gets its own client; clients of closed loops
+    are dropped. Outside a running loop one shared client is returned.
+    """
+    api_key = api_key or get_api_key()
+    key = (api_key, base_url)
+    loop = _running_loop()
+    with _lock:
+        for closed in [other for other in _async_clients if other is not None and other.is_closed()]:
+            del _async_clients[closed]
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(limits=pool_limits(**limits), timeout=TIMEOUT)
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            clients[key] = client
+    return client
+
+
+def close_clients():
+    """close every pooled client, e.g. at the end of a batch job"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_async_clients():
+    """close the pooled async clients of this event loop; await it before the loop shuts down"""
+    with _lock:
+        clients = list(_async_clients.pop(_running_loop(), {}).values())
+        clients += _async_clients.pop(None, {}).values()
+    for client in clients:
+        await client.close()
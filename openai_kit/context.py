@@ -0,0 +1,142 @@
+import threading
+
+from openai_kit.tokens import count_tokens, message_tokens
+
+SUMMARY_INSTRUCTIONS = ("Summarize this customer conversation for the assistant that will continue it. "
+                        "Keep names, account details, requests and anything already promised. Be brief.")
+
+
+class _Ledger:
+    def __init__(self):
+        self.messages = []  # (role, text, tokens), oldest first
+        self.tokens = 0
+        self.seed_id = None
+
+    def add(self, role, text, model):
+        tokens = message_tokens({"role": role, "content": text}, model)
+        self.messages.append((role, text, tokens))
+        self.tokens += tokens
+        return tokens
+
+
+def _transcript(messages):
+    return "\n".join(f"{role.capitalize()}: {text}" for role, text, _ in messages)
+
+
+class ThreadContext:
+    """per-thread token budget for long assistant conversations.
+
+    Every message added to or read from a thread is counted locally with the model's
+    tokenizer (cached per process), so the prompt size of the next run is known
+    without asking the API. Threads cannot drop messages, so when a new message would
+    take a thread past `budget` tokens (instructions included), prepare() moves the
+    conversation to a fresh thread seeded with a single message: a summary of the
+    older turns (or nothing with summary_model=None) followed by the most recent
+    turns, up to keep_recent_tokens, verbatim. Each run's estimated and reported
+    prompt tokens are kept in `usage`.
+    """
+
+    def __init__(self, client, model: str = "gpt-4-1106-preview", budget: int = 8000,
+                 keep_recent_tokens: int = None, summary_model: str = "gpt-3.5-turbo", summary_tokens: int = 300):
+        self.client = client
+        self.model = model
+        self.budget = budget
+        self.keep_recent_tokens = budget // 2 if keep_recent_tokens is None else keep_recent_tokens
+        self.summary_model = summary_model
+        self.summary_tokens = summary_tokens
+        self.usage = []
+        self._ledgers = {}
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    def _ledger(self, thread_id):
+        with self._lock:
+            return self._ledgers.setdefault(thread_id, _Ledger())
+
+    def tokens(self, thread_id):
+        return self._ledger(thread_id).tokens
+
+    def seed_id(self, thread_id):
+        """id of the message a compacted thread was seeded with, or None"""
+        return self._ledger(thread_id).seed_id
+
+    def record(self, thread_id, role, text):
+        """count a message added to thread_id; returns its tokens"""
+        return self._ledger(thread_id).add(role, text, self.model)
+
+    def estimate(self, thread_id, instructions=None):
+        """prompt tokens of a run on thread_id now"""
+        return self.tokens(thread_id) + count_tokens(instructions or "", self.model)
+
+    def prepare(self, thread_id, content, instructions=None):
+        """thread to add `content` to: thread_id, or a compacted copy when it would exceed the budget"""
+        incoming = message_tokens({"role": "user", "content": content}, self.model)
+        if self.estimate(thread_id, instructions) + incoming <= self.budget:
+            return thread_id
+        if not self._ledger(thread_id).messages:
+            # nothing to carry over, e.g. a one-shot question that is long on its own
+            return thread_id
+        return self.compact(thread_id)
+
+    def _split(self, messages):
+        """(older, recent) with recent the newest messages fitting keep_recent_tokens"""
+        kept = 0
+        for index in range(len(messages), 0, -1):
+            kept += messages[index - 1][2]
+            if kept > self.keep_recent_tokens:
+                return messages[:index], messages[index:]
+        return [], messages
+
+    def summarize(self, messages):
+        completion = self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[{"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                      {"role": "user", "content": _transcript(messages)}],
+            max_tokens=self.summary_tokens,
+        )
+        return completion.choices[0].message.content.strip()
+
+    def compact(self, thread_id):
+        """start a new thread carrying a summary and the recent turns of thread_id; returns its id"""
+        ledger = self._ledger(thread_id)
+        older, recent = self._split(ledger.messages)
+        parts = []
+        if older and self.summary_model:
+            parts.append(f"Summary of the earlier conversation:\n{self.summarize(older)}")
+        if recent:
+            parts.append(f"Most recent messages:\n{_transcript(recent)}")
+
+        thread = self.client.beta.threads.create()
+        if parts:
+            seed = "\n\n".join(parts)
+            message = self.client.beta.threads.messages.create(thread_id=thread.id, role="user", content=seed)
+            self.record(thread.id, "user", seed)
+            self._ledger(thread.id).seed_id = message.id
+        print(f"Thread {thread_id} reached {ledger.tokens} tokens; continuing on {thread.id} "
+              f"with {self.tokens(thread.id)}")
+        self.forget(thread_id)
+        return thread.id
+
+    def forget(self, thread_id):
+        """drop the ledger of a thread that will not be continued"""
+        with self._lock:
+            self._ledgers.pop(thread_id, None)
+
+    def begin_run(self, run, instructions=None):
+        """note the estimated prompt tokens of a run just created"""
+        estimated = self.estimate(run.thread_id, instructions)
+        with self._lock:
+            self._estimates[run.id] = estimated
+        return estimated
+
+    def record_run(self, run):
+        """keep the prompt tokens of a finished run: our estimate and, when the API reports it, the actual count"""
+        usage = getattr(run, "usage", None)
+        with self._lock:
+            estimated = self._estimates.pop(run.id, None)
+        entry = {"run_id": run.id, "thread_id": run.thread_id, "estimated_prompt_tokens": estimated,
+                 "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                 "completion_tokens": getattr(usage, "completion_tokens", None)}
+        with self._lock:
+            self.usage.append(entry)
+        return entry
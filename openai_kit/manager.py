@@ -0,0 +1,172 @@
+from openai_kit.client import get_client
+from openai_kit.messages import MessageReader
+from openai_kit.registry import ResourceRegistry
+from openai_kit.tools import ToolDispatcher
+from openai_kit.waiter import RunWaiter
+
+
+class AssistantManager:
+    """one assistant shared by any number of threads.
+
+    The create_thread / add_message_to_thread / run_assistant / wait_for_completion
+    calls keep track of a "current" thread and run for simple scripts. Every method
+    also takes an explicit thread_id or run, so a single manager can serve many
+    conversations concurrently (see ask).
+
+    With a ThreadContext (openai_kit.context), messages are counted as they are added
+    and read, a thread about to exceed its token budget continues on a compacted
+    copy, and each run's prompt tokens are recorded in context.usage.
+    """
+
+    def __init__(self, client=None, model: str = "gpt-4-1106-preview", waiter: RunWaiter = None,
+                 registry: ResourceRegistry = None, tools: ToolDispatcher = None, answer_cache=None,
+                 context=None):
+        self.client = client or get_client()
+        self.model = model
+        self.waiter = waiter or RunWaiter(self.client)
+        self.registry = registry
+        self.tools = tools
+        self.answer_cache = answer_cache
+        self.context = context
+        self.messages = MessageReader(self.client)
+        self.file_ids = []
+        self.assistant = None
+        self.thread = None
+        self.run = None
+
+    @property
+    def file_id(self):
+        return self.file_ids[-1] if self.file_ids else None
+
+    def create_file(self, file_path, purpose='assistants'):
+        """upload file_path, or reuse the registry's copy when its content is unchanged"""
+        file_id = None
+        if self.registry:
+            content_hash, file_id = self.registry.lookup_file(file_path, purpose)
+        if file_id is None:
+            with open(file_path, "rb") as file:
+                file_id = self.client.files.create(file=file, purpose=purpose).id
+            if self.registry:
+                self.registry.record_file(content_hash, file_path, file_id, purpose)
+        self.file_ids.append(file_id)
+        return file_id
+
+    def create_assistant(self, name, instructions, tools):
+        """create the assistant, or reuse the registry's one when the config is unchanged"""
+        if self.registry:
+            config_hash, self.assistant = self.registry.lookup_assistant(
+                name, instructions, tools, self.model, self.file_ids)
+            if self.assistant is not None:
+                return self.assistant
+
+        kwargs = {"file_ids": self.file_ids} if self.file_ids else {}
+        self.assistant = self.client.beta.assistants.create(
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            model=self.model,
+            **kwargs
+        )
+        if self.registry:
+            self.registry.record_assistant(config_hash, self.assistant)
+        return self.assistant
+
+    def create_thread(self):
+        self.thread = self.client.beta.threads.create()
+        return self.thread
+
+    def add_message_to_thread(self, role, content, thread_id=None):
+        """add a message; with a context the thread may be compacted first, see message.thread_id"""
+        thread_id = thread_id or self.thread.id
+        if self.context is not None:
+            compacted = self.context.prepare(thread_id, content, self.assistant and self.assistant.instructions)
+            if compacted != thread_id:
+                # the seed message is context the assistant reads, not a new message to print
+                self.messages.last_seen[compacted] = self.context.seed_id(compacted)
+                if self.thread is not None and self.thread.id == thread_id:
+                    self.thread = self.client.beta.threads.retrieve(compacted)
+                thread_id = compacted
+        message = self.client.beta.threads.messages.create(
+            thread_id=thread_id,
+            role=role,
+            content=content
+        )
+        if self.context is not None:
+            self.context.record(thread_id, role, content)
+        return message
+
+    def run_assistant(self, instructions, thread_id=None):
+        self.run = self.client.beta.threads.runs.create(
+            thread_id=thread_id or self.thread.id,
+            assistant_id=self.assistant.id,
+            instructions=instructions
+        )
+        if self.context is not None:
+            self.context.begin_run(self.run, instructions or self.assistant.instructions)
+        return self.run
+
+    def wait_for_completion(self, run=None):
+        run = run or self.run
+        run_status = self.waiter.poll(
+            thread_id=run.thread_id,
+            run_id=run.id,
+            on_requires_action=self.call_required_functions
+        )
+        print(run_status.model_dump_json(indent=4))
+        self.process_messages(thread_id=run.thread_id)
+        if self.context is not None:
+            usage = self.context.record_run(run_status)
+            print(f"Prompt tokens: {usage['prompt_tokens']} (estimated {usage['estimated_prompt_tokens']})")
+        return run_status
+
+    def process_messages(self, thread_id=None):
+        """print and return the messages added to the thread since the last call"""
+        messages = []
+        for msg in self.messages.new_messages(thread_id or self.thread.id):
+            role = msg.role
+            content = msg.content[0].text.value
+            print(f"{role.capitalize()}: {content}")
+            if self.context is not None and role == "assistant":
+                # user messages were counted when they were added
+                self.context.record(msg.thread_id, role, content)
+            messages.append(msg)
+        return messages
+
+    def call_required_functions(self, run):
+        """return the tool outputs for a requires_action run using the tools dispatcher"""
+        if self.tools is None:
+            names = [call.function.name for call in run.required_action.submit_tool_outputs.tool_calls]
+            raise ValueError(f"Unknown function: {', '.join(names)}")
+        return self.tools(run)
+
+    def ask(self, content, instructions=None):
+        """run one question on a fresh thread and return the assistant's reply text.
+
+        Nothing is stored on the manager, so ask is safe to call from many threads at once.
+        With an answer_cache (e.g. a SemanticCache), questions similar to one already
+        answered by this assistant and instructions are answered from the cache.
+        """
+        if self.answer_cache is not None:
+            return self.answer_cache.get_or_ask(content, lambda: self._ask(content, instructions),
+                                                context=(self.assistant.id, instructions))
+        return self._ask(content, instructions)
+
+    def _ask(self, content, instructions=None):
+        thread = self.client.beta.threads.create()
+        # an oversized question may already be moved to a compacted thread
+        thread_id = self.add_message_to_thread("user", content, thread_id=thread.id).thread_id
+        kwargs = {"instructions": instructions} if instructions else {}
+        try:
+            run = self.waiter.run(thread_id, self.assistant.id, on_requires_action=self.call_required_functions,
+                                  **kwargs)
+            if self.context is not None:
+                # the ledger still holds only the question, so the estimate is the run's prompt
+                self.context.begin_run(run, instructions or self.assistant.instructions)
+                self.context.record_run(run)
+        finally:
+            if self.context is not None:
+                # nothing is added to a one-shot thread again
+                self.context.forget(thread_id)
+                self.messages.last_seen.pop(thread_id, None)
+        messages = self.client.beta.threads.messages.list(thread_id=thread_id, order="desc", limit=1)
+        return messages.data[0].content[0].text.value
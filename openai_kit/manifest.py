@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime
+
+
+class JobManifest:
+    """SQLite record of per-file job progress, so an interrupted batch can resume.
+
+    A file counts as done only while its size and mtime match what was recorded
+    when it completed; a modified file is processed again. Failed files are retried
+    on the next run, up to max_attempts in total.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._db:
+            return self._db.execute(sql, params).fetchall()
+
+    def is_pending(self, path):
+        rows = self._execute("SELECT size, mtime, status, attempts FROM jobs WHERE path = ?", (path,))
+        if not rows:
+            return True
+        size, mtime, status, attempts = rows[0]
+        if (size, mtime) != _identity(path):
+            return True
+        if status == "done":
+            return False
+        return attempts < self.max_attempts
+
+    def pending(self, paths):
+        return [path for path in paths if self.is_pending(path)]
+
+    def _record(self, path, status, error=None):
+        size, mtime = _identity(path)
+        self._execute(
+            "INSERT INTO jobs VALUES (?, ?, ?, ?, 1, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+            "size = excluded.size, mtime = excluded.mtime, status = excluded.status, "
+            "attempts = CASE WHEN jobs.size = excluded.size AND jobs.mtime = excluded.mtime "
+            "THEN jobs.attempts + 1 ELSE 1 END, error = excluded.error, updated_at = excluded.updated_at",
+            (path, size, mtime, status, error, time.time()))
+
+    def mark_done(self, path):
+        self._record(path, "done")
+
+    def mark_failed(self, path, error):
+        self._record(path, "failed", str(error))
+
+    def counts(self):
+        return dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
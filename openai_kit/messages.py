@@ -0,0 +1,49 @@
+class MessageReader:
+    """read each thread's messages incrementally, oldest first.
+
+    The id of the last message yielded per thread is remembered, and the next read
+    asks the API only for messages after it (order="asc", after=<id>), following
+    pages until the end. Per-turn I/O therefore grows with the number of new
+    messages, not with the length of the thread. Pass `last_seen` to resume from
+    cursors saved elsewhere.
+    """
+
+    def __init__(self, client, page_size: int = 100, last_seen: dict = None):
+        self.client = client
+        self.page_size = page_size
+        self.last_seen = dict(last_seen or {})
+
+    def _params(self, thread_id, cursor):
+        params = {"thread_id": thread_id, "order": "asc", "limit": self.page_size}
+        if cursor:
+            params["after"] = cursor
+        return params
+
+    def _is_last_page(self, page):
+        has_more = getattr(page, "has_more", None)
+        return not page.data or (has_more is False) or (has_more is None and len(page.data) < self.page_size)
+
+    def new_messages(self, thread_id):
+        """yield the messages added to thread_id since the previous read"""
+        cursor = self.last_seen.get(thread_id)
+        while True:
+            page = self.client.beta.threads.messages.list(**self._params(thread_id, cursor))
+            for message in page.data:
+                self.last_seen[thread_id] = cursor = message.id
+                yield message
+            if self._is_last_page(page):
+                return
+
+
+class AsyncMessageReader(MessageReader):
+    """MessageReader for AsyncOpenAI"""
+
+    async def new_messages(self, thread_id):
+        cursor = self.last_seen.get(thread_id)
+        while True:
+            page = await self.client.beta.threads.messages.list(**self._params(thread_id, cursor))
+            for message in page.data:
+                self.last_seen[thread_id] = cursor = message.id
+                yield message
+            if self._is_last_page(page):
+                return
@@ -0,0 +1,80 @@
+import math
+import threading
+from concurrent.futures import Future
+
+
+def yfinance_closing_prices(symbols):
+    """latest closing price per symbol from one yf.download call"""
+    import yfinance as yf
+
+    symbols = list(symbols)
+    closes = yf.download(symbols, period="1d", progress=False)["Close"]
+    if closes.ndim == 1:
+        # a single ticker comes back as a Series rather than one column per symbol
+        closes = closes.to_frame(symbols[0])
+    last = closes.ffill().iloc[-1]
+    return {symbol: float(last[symbol]) for symbol in symbols
+            if symbol in last.index and not math.isnan(last[symbol])}
+
+
+class QuoteBatcher:
+    """collect price lookups made within a short window and fetch them in one bulk call.
+
+    Every tool call of a requires_action step runs concurrently (see ToolDispatcher),
+    and so do the steps of concurrent runs, so lookups issued within `window` seconds
+    of each other share a single fetch_many(symbols) -> {symbol: price} call. A batch
+    is flushed early once it holds max_batch symbols.
+    """
+
+    def __init__(self, fetch_many=yfinance_closing_prices, window: float = 0.05, max_batch: int = 200):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def get(self, symbol: str) -> float:
+        symbol = symbol.strip().upper()
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch()
+            batch.symbols.add(symbol)
+            if len(batch.symbols) >= self.max_batch:
+                self._pending = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending is batch:
+                    self._pending = None
+                self.batches += 1
+            self._fetch(batch)
+
+        prices = batch.result.result()
+        if symbol not in prices:
+            raise LookupError(f"No price found for symbol '{symbol}'")
+        return prices[symbol]
+
+    def get_many(self, symbols):
+        """fetch several symbols in one call, bypassing the window"""
+        batch = _Batch()
+        batch.symbols.update(symbol.strip().upper() for symbol in symbols)
+        self._fetch(batch)
+        return batch.result.result()
+
+    def _fetch(self, batch):
+        try:
+            batch.result.set_result(self.fetch_many(sorted(batch.symbols)))
+        except BaseException as e:
+            batch.result.set_exception(e)
+
+
+class _Batch:
+    def __init__(self):
+        self.symbols = set()
+        self.full = threading.Event()
+        self.result = Future()
@@ -0,0 +1,70 @@
+import email.utils
+import threading
+import time
+
+
+class TokenBucket:
+    """thread-safe token bucket allowing `rate` acquisitions per `per` seconds.
+
+    Up to `capacity` tokens accumulate while idle, so capacity 1 spaces requests
+    evenly and larger values allow short bursts. pause() stops every caller for a
+    while, e.g. when the server answers 429 with Retry-After.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: float = 1.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate / per
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """block until `tokens` are available and take them"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            now = self.clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+
+
+def retry_after_seconds(headers, default: float = 1.0):
+    """delay requested by a 429/503 response: retry-after-ms, or Retry-After in seconds or as an HTTP date"""
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import openai
+from openai.types.beta import Assistant
+
+DEFAULT_PATH = os.getenv("OPENAI_REGISTRY_PATH", ".openai_registry.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    content_hash TEXT NOT NULL,
+    purpose TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    superseded INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_hash, purpose)
+);
+CREATE TABLE IF NOT EXISTS assistants (
+    config_hash TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    assistant_id TEXT NOT NULL,
+    assistant_json TEXT NOT NULL,
+    file_ids TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    superseded INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def assistant_config_hash(name, instructions, tools, model, file_ids=()):
+    config = {"name": name, "instructions": instructions, "tools": tools, "model": model,
+              "file_ids": sorted(file_ids)}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+class ResourceRegistry:
+    """local SQLite record of uploaded files and created assistants.
+
+    Files are keyed by a hash of their content and assistants by a hash of
+    name/instructions/tools/model/file_ids, so an unchanged script reuses the server-side
+    objects from its previous run instead of uploading and creating new ones. When a
+    path or assistant name maps to new content, the older object is marked superseded
+    and is deleted by collect_garbage, so assistants sharing one registry need distinct names.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._db:
+            return self._db.execute(sql, params).fetchall()
+
+    # files
+
+    def lookup_file(self, file_path, purpose='assistants'):
+        """return (content_hash, file_id), file_id being None when the content was never uploaded"""
+        content_hash = file_hash(file_path)
+        rows = self._execute("SELECT file_id FROM files WHERE content_hash = ? AND purpose = ?",
+                             (content_hash, purpose))
+        if not rows:
+            return content_hash, None
+        self._execute("UPDATE files SET last_used_at = ?, superseded = 0 WHERE content_hash = ? AND purpose = ?",
+                      (time.time(), content_hash, purpose))
+        self._supersede_files(file_path, purpose, content_hash)
+        return content_hash, rows[0][0]
+
+    def record_file(self, content_hash, file_path, file_id, purpose='assistants'):
+        now = time.time()
+        self._execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, 0)",
+                      (content_hash, purpose, os.path.abspath(file_path), file_id, now, now))
+        self._supersede_files(file_path, purpose, content_hash)
+
+    def _supersede_files(self, file_path, purpose, content_hash):
+        self._execute("UPDATE files SET superseded = 1 WHERE path = ? AND purpose = ? AND content_hash != ?",
+                      (os.path.abspath(file_path), purpose, content_hash))
+
+    # assistants
+
+    def lookup_assistant(self, name, instructions, tools, model, file_ids=()):
+        """return (config_hash, Assistant), the assistant being None when this config is new"""
+        config_hash = assistant_config_hash(name, instructions, tools, model, file_ids)
+        rows = self._execute("SELECT assistant_json FROM assistants WHERE config_hash = ?", (config_hash,))
+        if not rows:
+            return config_hash, None
+        self._execute("UPDATE assistants SET last_used_at = ?, superseded = 0 WHERE config_hash = ?",
+                      (time.time(), config_hash))
+        self._supersede_assistants(name, config_hash)
+        return config_hash, Assistant.model_validate_json(rows[0][0])
+
+    def record_assistant(self, config_hash, assistant):
+        now = time.time()
+        self._execute("INSERT OR REPLACE INTO assistants VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                      (config_hash, assistant.name, assistant.id, assistant.model_dump_json(),
+                       json.dumps(list(getattr(assistant, "file_ids", None) or [])), now, now))
+        self._supersede_assistants(assistant.name, config_hash)
+
+    def _supersede_assistants(self, name, config_hash):
+        self._execute("UPDATE assistants SET superseded = 1 WHERE name = ? AND config_hash != ?",
+                      (name, config_hash))
+
+    def forget_assistant(self, assistant_id):
+        """drop a cached assistant, e.g. after it was deleted outside this registry"""
+        self._execute("DELETE FROM assistants WHERE assistant_id = ?", (assistant_id,))
+
+    # garbage collection
+
+    def collect_garbage(self, client, max_idle_days: float = 30.0):
+        """delete superseded or long-unused assistants and files on the server and locally.
+
+        Files still attached to a live assistant are kept. Returns (assistants_deleted, files_deleted).
+        """
+        cutoff = time.time() - max_idle_days * 86400
+        stale_assistants = self._execute(
+            "SELECT config_hash, assistant_id FROM assistants WHERE superseded = 1 OR last_used_at < ?", (cutoff,))
+        for config_hash, assistant_id in stale_assistants:
+            try:
+                client.beta.assistants.delete(assistant_id)
+            except openai.NotFoundError:
+                pass
+            self._execute("DELETE FROM assistants WHERE config_hash = ?", (config_hash,))
+
+        in_use = set()
+        for (file_ids,) in self._execute("SELECT file_ids FROM assistants"):
+            in_use.update(json.loads(file_ids))
+        stale_files = [row for row in self._execute(
+            "SELECT content_hash, purpose, file_id FROM files WHERE superseded = 1 OR last_used_at < ?", (cutoff,))
+            if row[2] not in in_use]
+        for content_hash, purpose, file_id in stale_files:
+            try:
+                client.files.delete(file_id)
+            except openai.NotFoundError:
+                pass
+            self._execute("DELETE FROM files WHERE content_hash = ? AND purpose = ?", (content_hash, purpose))
+        return len(stale_assistants), len(stale_files)
+
+
+if __name__ == '__main__':
+    # python -m openai_kit.registry [max_idle_days] deletes stale assistants and files
+    import sys
+
+    from openai_kit.client import get_client
+
+    max_idle_days = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    assistants_deleted, files_deleted = ResourceRegistry().collect_garbage(get_client(), max_idle_days)
+    print(f"Deleted {assistants_deleted} assistants and {files_deleted} files")
@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+
+import numpy as np
+
+from openai_kit.vectors import _normalise, embed_texts
+
+
+def _normalise_question(text):
+    return " ".join(text.lower().split())
+
+
+class SemanticCache:
+    """answers keyed by the meaning of a question rather than its exact wording.
+
+    Questions are embedded and compared by cosine similarity with the questions
+    already answered; one scoring at least `threshold` returns the stored answer.
+    Identical (case- and whitespace-insensitive) questions skip the embedding call.
+    Entries expire after `ttl` seconds, and once max_entries are stored the least
+    recently used entry is replaced. Concurrent misses that are similar to a
+    question already being answered wait for that answer instead of asking again.
+    `context` partitions the cache, e.g. by assistant instructions.
+    """
+
+    def __init__(self, embed, threshold: float = 0.9, ttl: float = 86400.0, max_entries: int = 10000,
+                 clock=time.time):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = self.exact_hits = self.misses = self.coalesced = self.evictions = self.expirations = 0
+        self._vectors = None
+        self._questions = []
+        self._answers = []
+        self._contexts = []
+        self._context_ids = {}
+        self._context_of = np.zeros(max_entries, dtype=np.int32)
+        self._expires_at = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._exact = {}
+        self._inflight = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_client(cls, client, model: str = "text-embedding-3-small", **kwargs):
+        return cls(lambda texts: embed_texts(client, texts, model), **kwargs)
+
+    def __len__(self):
+        return len(self._answers)
+
+    def stats(self):
+        # coalesced lookups were answered without asking too
+        answered = self.hits + self.coalesced
+        lookups = answered + self.misses
+        return {"hits": self.hits, "exact_hits": self.exact_hits, "misses": self.misses,
+                "coalesced": self.coalesced, "evictions": self.evictions, "expirations": self.expirations,
+                "size": len(self), "hit_rate": answered / lookups if lookups else 0.0}
+
+    def _hit(self, row, now):
+        self._last_used[row] = now
+        self.hits += 1
+        return self._answers[row]
+
+    def _lookup_exact(self, question, context, now):
+        """stored answer for the same wording, or None; caller holds the lock"""
+        row = self._exact.get((context, _normalise_question(question)))
+        if row is None:
+            return None
+        if self._expires_at[row] <= now:
+            return None
+        self.exact_hits += 1
+        return self._hit(row, now)
+
+    def _lookup(self, vector, context, now):
+        """(answer or None, in-flight future or None); caller holds the lock"""
+        if self._answers:
+            size = len(self._answers)
+            live = (self._expires_at[:size] > now) & (self._context_of[:size] == self._context_id(context))
+            scores = np.where(live, self._vectors[:size] @ vector, -np.inf)
+            row = int(scores.argmax())
+            if scores[row] >= self.threshold:
+                return self._hit(row, now), None
+        for pending_vector, pending_context, future in self._inflight:
+            if pending_context == context and float(pending_vector @ vector) >= self.threshold:
+                self.coalesced += 1
+                return None, future
+        return None, None
+
+    def _context_id(self, context):
+        return self._context_ids.setdefault(context, len(self._context_ids))
+
+    def _slot(self, now):
+        """row for a new entry: append, else reuse an expired row, else evict the least recently used"""
+        size = len(self._answers)
+        if size < self.max_entries:
+            return size
+        expired = np.flatnonzero(self._expires_at[:size] <= now)
+        if len(expired):
+            self.expirations += 1
+            return int(expired[0])
+        self.evictions += 1
+        return int(self._last_used[:size].argmin())
+
+    def _store(self, question, vector, answer, context):
+        now = self.clock()
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            row = self._slot(now)
+            if row == len(self._answers):
+                self._questions.append(question)
+                self._answers.append(answer)
+                self._contexts.append(context)
+            else:
+                self._exact.pop((self._contexts[row], _normalise_question(self._questions[row])), None)
+                self._questions[row], self._answers[row], self._contexts[row] = question, answer, context
+            self._vectors[row] = vector
+            self._context_of[row] = self._context_id(context)
+            self._expires_at[row] = now + self.ttl
+            self._last_used[row] = now
+            self._exact[(context, _normalise_question(question))] = row
+
+    def _embed(self, question, context):
+        """(stored answer for the same wording, None) or (None, question vector); registers nothing"""
+        with self._lock:
+            answer = self._lookup_exact(question, context, self.clock())
+        if answer is not None:
+            return answer, None
+        return None, _normalise(self.embed([question]))[0]
+
+    def _claim(self, vector, context):
+        """(answer, waiting future, own future) for a lookup by vector; exactly one is set.
+
+        Kept separate from the embedding call so that an async caller only registers
+        its in-flight future once it is back on the event loop: a caller cancelled
+        while its embedding ran in a worker thread leaves nothing behind.
+        """
+        with self._lock:
+            answer, waiting = self._lookup(vector, context, self.clock())
+            if answer is not None or waiting is not None:
+                return answer, waiting, None
+            self.misses += 1
+            future = Future()
+            self._inflight.append((vector, context, future))
+        return None, None, future
+
+    def _end(self, future):
+        with self._lock:
+            self._inflight = [entry for entry in self._inflight if entry[2] is not future]
+
+    def get_or_ask(self, question, ask, context=None):
+        """a cached answer to a similar question, or ask() stored for next time"""
+        answer, vector = self._embed(question, context)
+        if answer is not None:
+            return answer
+        answer, waiting, future = self._claim(vector, context)
+        if answer is not None:
+            return answer
+        if waiting is not None:
+            try:
+                return waiting.result()
+            except CancelledError:
+                # the caller we were waiting on gave up without an answer; ask for ourselves
+                return self.get_or_ask(question, ask, context)
+        try:
+            answer = ask()
+        except Exception as e:
+            self._end(future)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # interrupted or cancelled: that is not an answer to share, so waiting callers ask again
+            self._end(future)
+            future.cancel()
+            raise
+        # stored before leaving the in-flight list so no lookup can miss both
+        self._store(question, vector, answer, context)
+        self._end(future)
+        future.set_result(answer)
+        return answer
+
+    async def aget_or_ask(self, question, ask, context=None):
+        """get_or_ask for a coroutine function ask; embedding runs in a worker thread"""
+        answer, vector = await asyncio.to_thread(self._embed, question, context)
+        if answer is not None:
+            return answer
+        # no await between claiming the future and the try below, so a cancellation cannot orphan it
+        answer, waiting, future = self._claim(vector, context)
+        if answer is not None:
+            return answer
+        if waiting is not None:
+            try:
+                # shielded so that cancelling this caller does not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(waiting))
+            except asyncio.CancelledError:
+                if not waiting.cancelled():
+                    raise
+                return await self.aget_or_ask(question, ask, context)
+        try:
+            answer = await ask()
+        except Exception as e:
+            self._end(future)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # e.g. the first caller timed out under asyncio.wait_for; waiting callers ask again
+            self._end(future)
+            future.cancel()
+            raise
+        self._store(question, vector, answer, context)
+        self._end(future)
+        future.set_result(answer)
+        return answer
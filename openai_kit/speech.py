@@ -0,0 +1,108 @@
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from openai_kit.blobcache import request_key
+
+# audio.speech.create accepts at most 4096 characters of input
+MAX_INPUT_CHARS = 4096
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+
+
+def split_sentences(text, max_chars=600):
+    """split text into chunks of whole sentences, each at most `max_chars` long.
+
+    Sentences longer than max_chars are split at the last space that fits.
+    """
+    chunks, current = [], ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            head, sentence = sentence[:cut].strip(), sentence[cut:].strip()
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(head)
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SpeechSynthesizer:
+    """text-to-speech for long scripts, pipelined sentence chunk by sentence chunk.
+
+    The text is split at sentence boundaries and up to `concurrency` chunks are
+    synthesized at once. Audio is yielded in text order as soon as it arrives: the
+    first chunk streams straight through while later chunks buffer in the background.
+    Chunks are concatenated byte for byte, which plays back seamlessly for mp3, opus,
+    aac and pcm but not for wav or flac, whose headers would repeat.
+
+    With a BlobCache, each chunk's audio is cached by (model, voice, format, text), so
+    re-synthesizing a script, or one that shares sentences with it, skips those requests.
+    """
+
+    def __init__(self, client, model: str = "tts-1", voice: str = "alloy", response_format: str = "mp3",
+                 max_chars: int = 600, concurrency: int = 4, chunk_size: int = None, cache=None):
+        self.client = client
+        self.model = model
+        self.voice = voice
+        self.response_format = response_format
+        self.max_chars = min(max_chars, MAX_INPUT_CHARS)
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.cache = cache
+
+    def _synthesize(self, text, output: queue.Queue):
+        params = dict(model=self.model, voice=self.voice, input=text, response_format=self.response_format)
+        try:
+            key = request_key(endpoint="audio.speech", **params)
+            cached = self.cache.get(key) if self.cache else None
+            if cached is not None:
+                output.put(cached)
+                return
+            audio = []
+            with self.client.audio.speech.with_streaming_response.create(**params) as response:
+                for data in response.iter_bytes(self.chunk_size):
+                    audio.append(data)
+                    output.put(data)
+            if self.cache:
+                self.cache.put(key, b"".join(audio))
+        except BaseException as e:
+            output.put(e)
+        finally:
+            output.put(None)
+
+    def iter_audio(self, text):
+        """yield audio bytes for `text` in order"""
+        chunks = split_sentences(text, self.max_chars)
+        if not chunks:
+            return
+        outputs = [queue.Queue() for _ in chunks]
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for chunk, output in zip(chunks, outputs):
+                pool.submit(self._synthesize, chunk, output)
+            for output in outputs:
+                while (data := output.get()) is not None:
+                    if isinstance(data, BaseException):
+                        raise data
+                    yield data
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stream_to_file(self, text, file_path):
+        """write the audio for `text` to file_path as it is synthesized"""
+        with open(file_path, "wb") as f:
+            for data in self.iter_audio(text):
+                f.write(data)
+                f.flush()
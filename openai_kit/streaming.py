@@ -0,0 +1,82 @@
+import time
+
+
+class StreamStats:
+    """timing of one streamed completion; `chunks` approximates tokens (one content delta each)"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started_at = clock()
+        self.first_token_at = None
+        self.finished_at = None
+        self.chunks = 0
+
+    def record(self):
+        if self.first_token_at is None:
+            self.first_token_at = self.clock()
+        self.chunks += 1
+
+    def finish(self):
+        self.finished_at = self.clock()
+
+    @property
+    def time_to_first_token(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started_at
+
+    @property
+    def total_time(self):
+        return (self.finished_at or self.clock()) - self.started_at
+
+    @property
+    def tokens_per_second(self):
+        if self.first_token_at is None:
+            return 0.0
+        generation_time = (self.finished_at or self.clock()) - self.first_token_at
+        return self.chunks / generation_time if generation_time > 0 else 0.0
+
+    def __str__(self):
+        ttft = "n/a" if self.time_to_first_token is None else f"{self.time_to_first_token:.2f}s"
+        return (f"time to first token {ttft}, {self.chunks} tokens in {self.total_time:.2f}s "
+                f"({self.tokens_per_second:.1f} tokens/s)")
+
+
+def _delta_text(chunk):
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+def stream_chat(client, stats: StreamStats = None, **create_kwargs):
+    """yield the text of a chat completion as it is generated.
+
+    Pass a StreamStats to collect time-to-first-token and tokens/sec; it is
+    finished when the generator is exhausted or closed.
+    """
+    stats = stats if stats is not None else StreamStats()
+    stats.started_at = stats.clock()
+    stream = client.chat.completions.create(stream=True, **create_kwargs)
+    try:
+        for chunk in stream:
+            text = _delta_text(chunk)
+            if text:
+                stats.record()
+                yield text
+    finally:
+        stream.close()
+        stats.finish()
+
+
+async def astream_chat(client, stats: StreamStats = None, **create_kwargs):
+    """stream_chat for AsyncOpenAI"""
+    stats = stats if stats is not None else StreamStats()
+    stats.started_at = stats.clock()
+    stream = await client.chat.completions.create(stream=True, **create_kwargs)
+    try:
+        async for chunk in stream:
+            text = _delta_text(chunk)
+            if text:
+                stats.record()
+                yield text
+    finally:
+        await stream.close()
+        stats.finish()
@@ -0,0 +1,41 @@
+import functools
+
+import tiktoken
+
+# chat formatting overhead, as counted by the OpenAI cookbook for gpt-3.5/gpt-4 models
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+REPLY_PRIMING_TOKENS = 3
+
+
+@functools.lru_cache(maxsize=None)
+def encoding_for(model: str = "gpt-3.5-turbo"):
+    """the tiktoken encoding of model, loaded once per process"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base" if model.startswith(("gpt-4o", "o1", "o3")) else "cl100k_base")
+
+
+def count_tokens(text, model: str = "gpt-3.5-turbo"):
+    return len(encoding_for(model).encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, max_tokens, model: str = "gpt-3.5-turbo"):
+    """text cut to at most max_tokens tokens"""
+    encoding = encoding_for(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max(max_tokens, 0)])
+
+
+def message_tokens(message, model: str = "gpt-3.5-turbo"):
+    """tokens one chat message adds to a prompt"""
+    tokens = TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "", model)
+    if message.get("name"):
+        tokens += TOKENS_PER_NAME + count_tokens(message["name"], model)
+    return tokens
+
+
+def chat_tokens(messages, model: str = "gpt-3.5-turbo"):
+    """prompt tokens of a list of chat messages"""
+    return sum(message_tokens(message, model) for message in messages) + REPLY_PRIMING_TOKENS
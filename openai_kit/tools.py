@@ -0,0 +1,124 @@
+import asyncio
+import functools
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+
+class ToolDispatcher:
+    """registry of tool name -> callable that runs one requires_action step concurrently.
+
+    Blocking functions run on a thread pool and coroutine functions natively, so a step
+    takes as long as its slowest tool rather than the sum of all of them. A tool that
+    raises or exceeds its timeout is reported back to the model as {"error": ...}
+    instead of failing the run.
+
+    Use an instance as the run waiter's on_requires_action (sync) or await acall (async).
+    """
+
+    def __init__(self, timeout: float = 30.0, max_workers: int = 32):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.functions = {}
+        self._definitions = {}
+        self._timeouts = {}
+        self._executor = None
+
+    def register(self, func=None, *, name=None, description=None, parameters=None, timeout=None):
+        """register func under name (default func.__name__); usable as a decorator.
+
+        When parameters (a JSON schema) is given, the tool is also included in definitions().
+        """
+        if func is None:
+            return functools.partial(self.register, name=name, description=description,
+                                     parameters=parameters, timeout=timeout)
+        name = name or func.__name__
+        self.functions[name] = func
+        if timeout is not None:
+            self._timeouts[name] = timeout
+        if parameters is not None:
+            self._definitions[name] = {
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": description or inspect.getdoc(func) or "",
+                    "parameters": parameters,
+                }
+            }
+        return func
+
+    def definitions(self):
+        """tool definitions for assistants.create"""
+        return list(self._definitions.values())
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _tool_calls(self, run):
+        tool_calls = run.required_action.submit_tool_outputs.tool_calls
+        unknown = [call.function.name for call in tool_calls if call.function.name not in self.functions]
+        if unknown:
+            raise ValueError(f"Unknown function: {', '.join(unknown)}")
+        print("Function Calling ...")
+        return tool_calls
+
+    def _output(self, call, result=None, error=None):
+        if error is not None:
+            result = {"error": error}
+        output = result if isinstance(result, str) else json.dumps(result, default=str)
+        return {"tool_call_id": call.id, "output": output}
+
+    def _error_message(self, call, error):
+        if isinstance(error, (FuturesTimeoutError, asyncio.TimeoutError)):
+            return f"{call.function.name} timed out after {self._timeouts.get(call.function.name, self.timeout)}s"
+        return f"{call.function.name} failed: {error}"
+
+    def _invoke(self, call):
+        func = self.functions[call.function.name]
+        result = func(**json.loads(call.function.arguments or "{}"))
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+        return result
+
+    def __call__(self, run):
+        started = time.monotonic()
+        tool_calls = self._tool_calls(run)
+        futures = [self.executor.submit(self._invoke, call) for call in tool_calls]
+
+        tool_outputs = []
+        for call, future in zip(tool_calls, futures):
+            deadline = started + self._timeouts.get(call.function.name, self.timeout)
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                future.cancel()
+                tool_outputs.append(self._output(call, error=self._error_message(call, e)))
+            else:
+                tool_outputs.append(self._output(call, result))
+        return tool_outputs
+
+    async def _ainvoke(self, call):
+        func = self.functions[call.function.name]
+        arguments = json.loads(call.function.arguments or "{}")
+        if inspect.iscoroutinefunction(func):
+            pending = func(**arguments)
+        else:
+            pending = asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, **arguments))
+        try:
+            result = await asyncio.wait_for(pending, self._timeouts.get(call.function.name, self.timeout))
+        except Exception as e:
+            return self._output(call, error=self._error_message(call, e))
+        return self._output(call, result)
+
+    async def acall(self, run):
+        tool_calls = self._tool_calls(run)
+        return list(await asyncio.gather(*(self._ainvoke(call) for call in tool_calls)))
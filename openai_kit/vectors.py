@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_MODEL = "text-embedding-3-small"
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalise(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_texts(client, texts, model=DEFAULT_MODEL, batch_size=256, concurrency=4):
+    """unit-length embeddings of texts as a float32 matrix, requested batch_size at a time"""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    def embed_batch(batch):
+        response = client.embeddings.create(model=model, input=batch)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    if len(batches) == 1:
+        return _normalise(embed_batch(batches[0]))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        rows = [row for batch in pool.map(embed_batch, batches) for row in batch]
+    return _normalise(rows)
+
+
+def _top_k(scores, k):
+    """positions of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def spherical_kmeans(vectors, n_lists, iterations=10, seed=0, chunk=65536):
+    """(centroids, assignment) of unit vectors clustered by cosine similarity"""
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    assignment = np.zeros(len(vectors), dtype=np.int32)
+    for _ in range(iterations):
+        for start in range(0, len(vectors), chunk):
+            assignment[start:start + chunk] = (vectors[start:start + chunk] @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=n_lists)
+        empty = counts == 0
+        # re-seed empty clusters with random vectors
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalise(sums)
+    return centroids, assignment
+
+
+class VectorIndex:
+    """on-disk embedding index with exact or clustered (IVF) cosine search.
+
+    Vectors live in `directory`/vectors-<generation>.f32, an (n, dim) float32 matrix
+    of unit rows that is memory-mapped rather than loaded, and ids.json records each
+    row's id and content hash along with the name of the vectors file. update() only
+    embeds texts whose hash is not already indexed and writes a new generation; the
+    rename of ids.json is the single commit point, so a crash leaves either the old
+    or the new index, never new vectors under old ids. With build_ivf(), searches
+    score the rows of the n_probe clusters nearest the query instead of every row.
+    """
+
+    def __init__(self, directory: str, client=None, model: str = DEFAULT_MODEL, batch_size: int = 256,
+                 concurrency: int = 4):
+        self.directory = directory
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.ids, self.hashes = [], []
+        self.generation = 0
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.centroids = self.lists = self.offsets = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        if not os.path.exists(self._path("ids.json")):
+            return
+        with open(self._path("ids.json")) as f:
+            meta = json.load(f)
+        # a new generation is written even when the old one is from another model
+        self.generation = meta.get("generation", 0)
+        if meta["model"] != self.model:
+            # vectors from another model are not comparable; re-embed everything
+            return
+        self.ids, self.hashes = meta["ids"], meta["hashes"]
+        if self.ids:
+            self.vectors = np.memmap(self._path(meta.get("vectors", "vectors.f32")), dtype=np.float32, mode="r",
+                                     shape=(len(self.ids), meta["dim"]))
+        ivf_path = self._path(self._ivf_name())
+        if os.path.exists(ivf_path):
+            ivf = np.load(ivf_path)
+            if len(ivf["lists"]) == len(self.ids):
+                self.centroids, self.lists, self.offsets = ivf["centroids"], ivf["lists"], ivf["offsets"]
+
+    def _vectors_name(self, generation=None):
+        return f"vectors-{self.generation if generation is None else generation}.f32"
+
+    def _ivf_name(self):
+        return f"ivf-{self.generation}.npz"
+
+    def _remove_stale(self):
+        """delete vectors and IVF files of other generations, e.g. left by a crash before the commit"""
+        current = {self._vectors_name(), self._ivf_name()}
+        for name in os.listdir(self.directory):
+            if name not in current and (name.startswith(("vectors", "ivf")) or name == "ids.json.tmp"):
+                os.remove(self._path(name))
+
+    def embed(self, texts):
+        return embed_texts(self.client, texts, self.model, self.batch_size, self.concurrency)
+
+    def update(self, items):
+        """index {id: text}, replacing the previous contents; returns how many texts were embedded"""
+        ids = list(items)
+        hashes = [content_hash(items[item_id]) for item_id in ids]
+        known = {h: row for row, h in enumerate(self.hashes)}
+        missing = list(dict.fromkeys(h for h in hashes if h not in known))
+        texts = {h: items[item_id] for item_id, h in zip(ids, hashes)}
+        fresh = self.embed([texts[h] for h in missing]) if missing else None
+
+        dim = fresh.shape[1] if fresh is not None else self.vectors.shape[1]
+        fresh_rows = {h: row for row, h in enumerate(missing)}
+        generation = self.generation + 1
+        vectors_name = self._vectors_name(generation)
+        if ids:
+            # nothing refers to this file until ids.json names it
+            matrix = np.memmap(self._path(vectors_name), dtype=np.float32, mode="w+", shape=(len(ids), dim))
+            for row, h in enumerate(hashes):
+                matrix[row] = fresh[fresh_rows[h]] if h in fresh_rows else self.vectors[known[h]]
+            matrix.flush()
+            del matrix
+        self._write_json("ids.json", {"model": self.model, "dim": int(dim), "generation": generation,
+                                      "vectors": vectors_name, "ids": ids, "hashes": hashes})
+        self.centroids = self.lists = self.offsets = None
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self._load()
+        self._remove_stale()
+        return len(missing)
+
+    def _write_json(self, name, payload):
+        tmp_path = self._path(name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._path(name))
+
+    def build_ivf(self, n_lists: int = None, iterations: int = 10):
+        """cluster the rows (about sqrt(n) clusters by default) so searches can skip most of them"""
+        n_lists = n_lists or max(1, int(np.sqrt(len(self))))
+        vectors = np.asarray(self.vectors)
+        centroids, assignment = spherical_kmeans(vectors, n_lists, iterations)
+        lists = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+        # tied to the generation, so it is never read against another generation's rows
+        tmp_path = self._path(self._ivf_name() + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, centroids=centroids, lists=lists, offsets=offsets)
+        os.replace(tmp_path, self._path(self._ivf_name()))
+        self.centroids, self.lists, self.offsets = centroids, lists, offsets
+
+    def search(self, query, k: int = 5, n_probe: int = 8):
+        """[(id, cosine similarity)] of the k rows nearest to query (a text or a vector), best first"""
+        if not len(self):
+            return []
+        vector = self.embed([query])[0] if isinstance(query, str) else _normalise(query)
+        if self.centroids is None:
+            rows = np.arange(len(self))
+        else:
+            probes = _top_k(self.centroids @ vector, n_probe)
+            rows = np.concatenate([self.lists[self.offsets[p]:self.offsets[p + 1]] for p in probes])
+            rows.sort()
+        scores = self.vectors[rows] @ vector if self.centroids is not None else self.vectors @ vector
+        return [(self.ids[rows[i]], float(scores[i])) for i in _top_k(scores, k)]
@@ -0,0 +1,260 @@
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+# Beyond this many frames between samples, seeking is cheaper than grabbing every frame.
+SEEK_THRESHOLD = 90
+
+
+def sample_indices(frame_count, fps, stride=None, count=None, interval=None):
+    """frame indices to keep: every `stride` frames, `count` evenly spaced frames, or one
+    frame every `interval` seconds (checked in that order; default every frame)"""
+    if frame_count <= 0:
+        return []
+    if stride is None and count is not None:
+        if count >= frame_count:
+            return list(range(frame_count))
+        step = frame_count / count
+        return [int(i * step) for i in range(count)]
+    if stride is None and interval is not None:
+        stride = max(1, round(interval * fps))
+    return list(range(0, frame_count, stride or 1))
+
+
+def downscale(frame, width):
+    """shrink frame to `width` pixels wide, keeping its aspect ratio; never upscales"""
+    if not width or frame.shape[1] <= width:
+        return frame
+    height = round(frame.shape[0] * width / frame.shape[1])
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def encode_frame(frame, quality=85):
+    _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return base64.b64encode(buffer).decode("utf-8")
+
+
+def iter_frames(video, stride=None, count=None, interval=None, resize=None, start=0, stop=None):
+    """yield (index, frame) for the sampled frames of a cv2.VideoCapture, downscaled to `resize`.
+
+    Skipped frames are only grabbed (never retrieved, colour-converted or copied) or, for large
+    gaps, skipped by seeking, so memory and work stay proportional to the frames kept.
+    start/stop restrict sampling to a frame range.
+    """
+    frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = video.get(cv2.CAP_PROP_FPS) or 25.0
+    if frame_count <= 0:
+        # some containers do not report a frame count; fall back to a sequential pass
+        yield from _iter_frames_sequential(video, stride or max(1, round((interval or 0) * fps)), resize)
+        return
+    stop = frame_count if stop is None else min(stop, frame_count)
+    indices = [start + i for i in sample_indices(stop - start, fps, stride, count, interval)]
+    yield from iter_frames_at(video, indices, resize)
+
+
+def iter_frames_at(video, indices, resize=None):
+    """yield (index, frame) for the given ascending frame indices, grabbing or seeking between them"""
+    position = int(video.get(cv2.CAP_PROP_POS_FRAMES))
+    for index in indices:
+        gap = index - position
+        if gap > SEEK_THRESHOLD or gap < 0:
+            video.set(cv2.CAP_PROP_POS_FRAMES, index)
+        else:
+            for _ in range(gap):
+                if not video.grab():
+                    return
+        success, frame = video.read()
+        if not success:
+            return
+        position = index + 1
+        yield index, downscale(frame, resize)
+
+
+def _iter_frames_sequential(video, stride, resize):
+    index = 0
+    while video.grab():
+        if index % stride == 0:
+            success, frame = video.retrieve()
+            if not success:
+                return
+            yield index, downscale(frame, resize)
+        index += 1
+
+
+def frame_signature(frame, width=32):
+    """cheap content signature: a tiny colour thumbnail as a unit-scaled float32 vector"""
+    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+    small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    return small.ravel().astype(np.float32) / 255.0
+
+
+def select_keyframes(signatures, budget, cut_threshold=0.1, time_weight=0.25, min_distance=0.02):
+    """pick up to `budget` rows of `signatures` that best represent the footage.
+
+    Scene cuts (a mean absolute difference above cut_threshold between consecutive
+    signatures) each get their first frame, strongest cuts first. The rest of the
+    budget goes to greedy farthest-point selection: repeatedly add the frame whose
+    nearest chosen frame is furthest away (pixel difference plus time_weight x
+    normalised time gap, so long static shots still get sparse coverage). Selection
+    stops early once every frame is within min_distance of a chosen one, so static
+    footage sends fewer frames. Returns positions into `signatures`, ascending.
+    """
+    signatures = np.asarray(signatures, dtype=np.float32)
+    n = len(signatures)
+    if n == 0 or budget <= 0:
+        return []
+    budget = min(budget, n)
+    times = np.linspace(0.0, 1.0, n, dtype=np.float32)[:, None]
+    features = np.hstack([signatures / signatures.shape[1], time_weight * times])
+
+    cut_strength = np.abs(np.diff(signatures, axis=0)).mean(axis=1)
+    cuts = np.flatnonzero(cut_strength > cut_threshold)
+    cuts = cuts[np.argsort(cut_strength[cuts])[::-1]] + 1
+    chosen = [0] + cuts[:budget - 1].tolist()
+
+    # one chosen frame at a time keeps memory at O(n x features), not O(n x budget x features)
+    nearest = np.full(n, np.inf, dtype=np.float32)
+    for index in chosen:
+        nearest = np.minimum(nearest, np.abs(features - features[index]).sum(axis=1))
+    while len(chosen) < budget:
+        candidate = int(nearest.argmax())
+        if nearest[candidate] < min_distance:
+            break
+        chosen.append(candidate)
+        nearest = np.minimum(nearest, np.abs(features - features[candidate]).sum(axis=1))
+    return sorted(chosen)
+
+
+def keyframe_indices(video, budget, scan_stride=5, **selection):
+    """scan every `scan_stride`-th frame's signature and return the frame indices to send"""
+    scanned, signatures = [], []
+    for index, frame in iter_frames(video, stride=scan_stride):
+        scanned.append(index)
+        signatures.append(frame_signature(frame))
+    return [scanned[i] for i in select_keyframes(signatures, budget, **selection)]
+
+
+def iter_keyframes(video, budget, scan_stride=5, resize=None, quality=85, **selection):
+    """yield base64 JPEGs of at most `budget` scene-representative frames.
+
+    A first pass over every scan_stride-th frame keeps only 32px-wide signatures; the
+    selected frames are then re-read, downscaled and encoded.
+    """
+    indices = keyframe_indices(video, budget, scan_stride, **selection)
+    video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _, frame in iter_frames_at(video, indices, resize):
+        yield encode_frame(frame, quality)
+
+
+def iter_base64_frames(video, stride=None, count=None, interval=None, resize=None, quality=85, start=0, stop=None):
+    """iter_frames, JPEG + base64 encoded"""
+    for _, frame in iter_frames(video, stride, count, interval, resize, start, stop):
+        yield encode_frame(frame, quality)
+
+
+def time_windows(duration, window, overlap=0.0):
+    """split `duration` seconds into consecutive windows of `window` seconds.
+
+    Returns (context_start, start, end) tuples: each window narrates [start, end) and
+    may look back `overlap` seconds from context_start for continuity. A short tail
+    window is merged into the previous one.
+    """
+    windows = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + window)
+        if duration - end < window / 4:
+            end = duration
+        windows.append((max(0.0, start - overlap), start, end))
+        start = end
+    return windows
+
+
+def window_base64_frames(path, start, end, count, resize=None, quality=85):
+    """base64 JPEGs of `count` evenly spaced frames between `start` and `end` seconds,
+    read through a VideoCapture of its own so windows can be read concurrently"""
+    video = cv2.VideoCapture(path)
+    try:
+        fps = video.get(cv2.CAP_PROP_FPS) or 25.0
+        first, stop = int(start * fps), int(end * fps)
+        video.set(cv2.CAP_PROP_POS_FRAMES, first)
+        return list(iter_base64_frames(video, count=count, resize=resize, quality=quality, start=first, stop=stop))
+    finally:
+        video.release()
+
+
+def _segments(items, parts):
+    """split items into at most `parts` contiguous, non-empty chunks"""
+    size = -(-len(items) // max(1, parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _encode_segment(task):
+    path, indices, resize, quality = task
+    video = cv2.VideoCapture(path)
+    try:
+        video.set(cv2.CAP_PROP_POS_FRAMES, indices[0])
+        return [encode_frame(frame, quality) for _, frame in iter_frames_at(video, indices, resize)]
+    finally:
+        video.release()
+
+
+def _signature_segment(task):
+    path, indices = task
+    video = cv2.VideoCapture(path)
+    try:
+        video.set(cv2.CAP_PROP_POS_FRAMES, indices[0])
+        return [(index, frame_signature(frame)) for index, frame in iter_frames_at(video, indices)]
+    finally:
+        video.release()
+
+
+def _video_info(path):
+    video = cv2.VideoCapture(path)
+    try:
+        return int(video.get(cv2.CAP_PROP_FRAME_COUNT)), video.get(cv2.CAP_PROP_FPS) or 25.0
+    finally:
+        video.release()
+
+
+def parallel_encode_frames(path, indices, resize=None, quality=85, workers=None, segments_per_worker=2):
+    """yield base64 JPEGs of frames `indices` of the video at `path`, in order.
+
+    The indices are split into contiguous segments that worker processes decode with
+    their own cv2.VideoCapture, downscale and encode; results are yielded in frame
+    order as segments complete.
+    """
+    indices = sorted(indices)
+    if not indices:
+        return
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, segment, resize, quality) for segment in _segments(indices, workers * segments_per_worker)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for frames in pool.map(_encode_segment, tasks):
+            yield from frames
+
+
+def parallel_base64_frames(path, stride=None, count=None, interval=None, resize=None, quality=85, workers=None):
+    """iter_base64_frames spread over a process pool; takes a path rather than a VideoCapture"""
+    frame_count, fps = _video_info(path)
+    indices = sample_indices(frame_count, fps, stride, count, interval)
+    return parallel_encode_frames(path, indices, resize, quality, workers)
+
+
+def parallel_keyframes(path, budget, scan_stride=5, resize=None, quality=85, workers=None, **selection):
+    """iter_keyframes with both the signature scan and the encoding spread over a process pool"""
+    frame_count, fps = _video_info(path)
+    scan = sample_indices(frame_count, fps, stride=scan_stride)
+    workers = workers or os.cpu_count() or 1
+    scanned, signatures = [], []
+    if scan:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_signature_segment, [(path, segment) for segment in _segments(scan, workers * 2)]):
+                for index, signature in chunk:
+                    scanned.append(index)
+                    signatures.append(signature)
+    indices = [scanned[i] for i in select_keyframes(signatures, budget, **selection)]
+    return parallel_encode_frames(path, indices, resize, quality, workers)
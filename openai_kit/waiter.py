@@ -0,0 +1,244 @@
+import asyncio
+import inspect
+import random
+import time
+
+import httpx
+import openai
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired")
+# a stream that stays silent past its read timeout is abandoned for polling
+STREAM_TIMEOUTS = (httpx.TimeoutException, openai.APITimeoutError)
+
+
+class RunError(RuntimeError):
+    """raised when a run ends in a non-completed terminal state"""
+
+    def __init__(self, run, message=None):
+        self.run = run
+        super().__init__(message or f"Run {run.id} ended with status '{run.status}'")
+
+
+class RunTimeoutError(RunError):
+    """raised when a run does not reach a terminal state before the deadline"""
+
+
+def backoff_delays(initial=0.2, maximum=5.0, factor=1.6, jitter=0.25):
+    """yield exponentially growing poll delays with +/- jitter, capped at maximum"""
+    delay = initial
+    while True:
+        spread = delay * jitter
+        yield max(0.0, delay + random.uniform(-spread, spread))
+        delay = min(maximum, delay * factor)
+
+
+class RunWaiter:
+    """wait for an assistant run to finish, following streamed events when the SDK
+    supports them and falling back to adaptive polling otherwise"""
+
+    def __init__(self, client, timeout: float = 300.0, initial_delay: float = 0.2,
+                 max_delay: float = 5.0, factor: float = 1.6, jitter: float = 0.25,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.client = client
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.sleep = sleep
+        self.clock = clock
+
+    def _delays(self):
+        return backoff_delays(self.initial_delay, self.max_delay, self.factor, self.jitter)
+
+    def _deadline(self):
+        return None if self.timeout is None else self.clock() + self.timeout
+
+    def _remaining(self, deadline):
+        return None if deadline is None else deadline - self.clock()
+
+    def _stream_options(self, deadline):
+        """request options bounding each read of an event stream by the time left"""
+        remaining = self._remaining(deadline)
+        return {} if remaining is None else {"timeout": max(remaining, 0.1)}
+
+    def _check_deadline(self, run, deadline):
+        remaining = self._remaining(deadline)
+        if run is not None and remaining is not None and remaining <= 0:
+            raise RunTimeoutError(run, f"Run {run.id} still '{run.status}' at its deadline")
+
+    def _finish(self, run):
+        if run.status != "completed":
+            raise RunError(run)
+        return run
+
+    def poll(self, thread_id, run_id, on_requires_action=None, deadline=None):
+        """poll runs.retrieve with backoff until the run is terminal; returns the completed run.
+
+        on_requires_action(run) must return the tool outputs to submit. The backoff is
+        reset after each submission since the run usually moves again quickly.
+        """
+        deadline = self._deadline() if deadline is None else deadline
+        delays = self._delays()
+        while True:
+            run = self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+
+            if run.status in TERMINAL_STATUSES:
+                return self._finish(run)
+            if run.status == "requires_action":
+                self._submit(run, on_requires_action)
+                delays = self._delays()
+                continue
+
+            remaining = self._remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise RunTimeoutError(run, f"Run {run.id} still '{run.status}' at its deadline")
+            delay = next(delays)
+            self.sleep(delay if remaining is None else min(delay, remaining))
+
+    def follow(self, events, thread_id, on_requires_action=None, deadline=None):
+        """consume a run event stream until a terminal run event arrives.
+
+        If the stream ends early (dropped connection, proxy timeout) or stays silent for
+        the rest of the deadline, the waiter falls back to polling the last run it saw.
+        """
+        deadline = self._deadline() if deadline is None else deadline
+        run = None
+        while events is not None:
+            next_events = None
+            # closing the stream returns its connection to the pool even when we stop early
+            with events:
+                try:
+                    for event in events:
+                        # step and message events are most of a long run, so check the deadline on every one
+                        self._check_deadline(run, deadline)
+                        if not event.event.startswith("thread.run.") or event.event.startswith("thread.run.step."):
+                            continue
+                        run = event.data
+                        if run.status in TERMINAL_STATUSES:
+                            return self._finish(run)
+                        if run.status == "requires_action":
+                            next_events = self._submit(run, on_requires_action, stream=True, deadline=deadline)
+                            break
+                except STREAM_TIMEOUTS:
+                    pass
+            events = next_events
+
+        if run is None:
+            raise RuntimeError("Run event stream ended before the run was created")
+        return self.poll(thread_id, run.id, on_requires_action, deadline)
+
+    def run(self, thread_id, assistant_id, on_requires_action=None, stream=True, deadline=None, **create_kwargs):
+        """create a run and wait for it; streams events when available, otherwise polls.
+
+        deadline (on self.clock) overrides the waiter's timeout for this run.
+        """
+        deadline = self._deadline() if deadline is None else deadline
+        runs = self.client.beta.threads.runs
+        if stream:
+            try:
+                events = runs.create(thread_id=thread_id, assistant_id=assistant_id, stream=True,
+                                     **self._stream_options(deadline), **create_kwargs)
+            except TypeError:
+                # openai SDKs before run streaming do not accept `stream`
+                pass
+            else:
+                return self.follow(events, thread_id, on_requires_action, deadline)
+
+        run = runs.create(thread_id=thread_id, assistant_id=assistant_id, **create_kwargs)
+        return self.poll(thread_id, run.id, on_requires_action, deadline)
+
+    def _submit(self, run, on_requires_action, stream=False, deadline=None):
+        if on_requires_action is None:
+            raise RunError(run, f"Run {run.id} requires action but no tool handler was given")
+        tool_outputs = on_requires_action(run)
+        print("Submitting outputs back to the Assistant...")
+        kwargs = {"stream": True, **self._stream_options(deadline)} if stream else {}
+        return self.client.beta.threads.runs.submit_tool_outputs(
+            thread_id=run.thread_id,
+            run_id=run.id,
+            tool_outputs=tool_outputs,
+            **kwargs
+        )
+
+
+class AsyncRunWaiter(RunWaiter):
+    """RunWaiter for AsyncOpenAI; on_requires_action may be a plain function or a coroutine"""
+
+    def __init__(self, client, sleep=asyncio.sleep, **kwargs):
+        super().__init__(client, sleep=sleep, **kwargs)
+
+    async def poll(self, thread_id, run_id, on_requires_action=None, deadline=None):
+        deadline = self._deadline() if deadline is None else deadline
+        delays = self._delays()
+        while True:
+            run = await self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+
+            if run.status in TERMINAL_STATUSES:
+                return self._finish(run)
+            if run.status == "requires_action":
+                await self._submit(run, on_requires_action)
+                delays = self._delays()
+                continue
+
+            remaining = self._remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise RunTimeoutError(run, f"Run {run.id} still '{run.status}' at its deadline")
+            delay = next(delays)
+            await self.sleep(delay if remaining is None else min(delay, remaining))
+
+    async def follow(self, events, thread_id, on_requires_action=None, deadline=None):
+        deadline = self._deadline() if deadline is None else deadline
+        run = None
+        while events is not None:
+            next_events = None
+            async with events:
+                try:
+                    async for event in events:
+                        # step and message events are most of a long run, so check the deadline on every one
+                        self._check_deadline(run, deadline)
+                        if not event.event.startswith("thread.run.") or event.event.startswith("thread.run.step."):
+                            continue
+                        run = event.data
+                        if run.status in TERMINAL_STATUSES:
+                            return self._finish(run)
+                        if run.status == "requires_action":
+                            next_events = await self._submit(run, on_requires_action, stream=True, deadline=deadline)
+                            break
+                except STREAM_TIMEOUTS:
+                    pass
+            events = next_events
+
+        if run is None:
+            raise RuntimeError("Run event stream ended before the run was created")
+        return await self.poll(thread_id, run.id, on_requires_action, deadline)
+
+    async def run(self, thread_id, assistant_id, on_requires_action=None, stream=True, deadline=None,
+                  **create_kwargs):
+        deadline = self._deadline() if deadline is None else deadline
+        runs = self.client.beta.threads.runs
+        if stream:
+            try:
+                events = await runs.create(thread_id=thread_id, assistant_id=assistant_id, stream=True,
+                                           **self._stream_options(deadline), **create_kwargs)
+            except TypeError:
+                pass
+            else:
+                return await self.follow(events, thread_id, on_requires_action, deadline)
+
+        run = await runs.create(thread_id=thread_id, assistant_id=assistant_id, **create_kwargs)
+        return await self.poll(thread_id, run.id, on_requires_action, deadline)
+
+    async def _submit(self, run, on_requires_action, stream=False, deadline=None):
+        if on_requires_action is None:
+            raise RunError(run, f"Run {run.id} requires action but no tool handler was given")
+        tool_outputs = on_requires_action(run)
+        if inspect.isawaitable(tool_outputs):
+            tool_outputs = await tool_outputs
+        kwargs = {"stream": True, **self._stream_options(deadline)} if stream else {}
+        return await self.client.beta.threads.runs.submit_tool_outputs(
+            thread_id=run.thread_id,
+            run_id=run.id,
+            tool_outputs=tool_outputs,
+            **kwargs
+        )
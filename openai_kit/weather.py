@@ -0,0 +1,113 @@
+import asyncio
+import os
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from openai_kit.waiter import backoff_delays
+
+CURRENT_URL = "https://api.weatherapi.com/v1/current.json"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class WeatherError(RuntimeError):
+    """a weather lookup that failed; status is the HTTP status, or None for network errors"""
+
+    def __init__(self, location, message, status=None):
+        self.location = location
+        self.status = status
+        super().__init__(f"Weather lookup for '{location}' failed"
+                         + (f" with HTTP {status}" if status else "") + f": {message}")
+
+
+def _forecast(location, response_status, payload):
+    if response_status != 200:
+        error = payload.get("error", {}) if isinstance(payload, dict) else {}
+        raise WeatherError(location, error.get("message", "unexpected response"), response_status)
+    try:
+        current = payload["current"]
+        return {
+            "temperature": current["temp_f"],
+            "description": current["condition"]["text"],
+            "humidity": current["humidity"],
+        }
+    except (KeyError, TypeError) as e:
+        # e.g. a proxy's HTML page, or a body without the fields we read
+        raise WeatherError(location, "malformed response", response_status) from e
+
+
+class WeatherClient:
+    """weatherapi.com client on a pooled keep-alive requests.Session.
+
+    Connect/read timeouts bound every attempt; 429 and 5xx responses and connection
+    errors are retried with exponential backoff (honouring Retry-After).
+    """
+
+    def __init__(self, api_key: str = None, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 32, url: str = CURRENT_URL):
+        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=["GET"], raise_on_status=False, respect_retry_after_header=True)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry))
+
+    def current(self, location: str) -> dict:
+        try:
+            response = self.session.get(self.url, params={"q": location, "key": self.api_key},
+                                        timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise WeatherError(location, str(e)) from e
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        return _forecast(location, response.status_code, payload)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncWeatherClient:
+    """WeatherClient counterpart on a pooled httpx.AsyncClient"""
+
+    def __init__(self, api_key: str = None, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 retries: int = 3, backoff_factor: float = 0.5, max_connections: int = 32, url: str = CURRENT_URL):
+        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
+        self.url = url
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def current(self, location: str) -> dict:
+        delays = backoff_delays(initial=self.backoff_factor, maximum=30.0, factor=2.0)
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self.client.get(self.url, params={"q": location, "key": self.api_key})
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise WeatherError(location, str(e)) from e
+                await asyncio.sleep(next(delays))
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                retry_after = response.headers.get("Retry-After")
+                delay = next(delays)
+                await asyncio.sleep(float(retry_after) if retry_after and retry_after.isdigit() else delay)
+                continue
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = None
+            return _forecast(location, response.status_code, payload)
+
+    async def close(self):
+        await self.client.aclose()